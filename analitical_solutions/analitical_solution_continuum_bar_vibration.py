@@ -35,34 +35,31 @@ Fabricio Fernandez <fabricio.hmf@gmail.com>
 # import external modules
 import numpy as np
 
-def continuum_bar_vibration_solution(L,E,rho,time,dt,vo,x_sol):
-	"""calculate the continuum bar vibration solution (mode 1)"""
-
-	# frequency of the system (mode 1)
-	w1 = (np.pi/2.0/L)*((E/rho)**0.5)
-	b1 = (np.pi/2.0/L)
+# import local modules
+from analitical_solutions import analitical_solution_tools as tools
 
-	# position in time
-	xt = []
-	vt = []
-	t  = []
+@tools.lru_cache()
+def continuum_bar_vibration_solution(L,E,rho,time,dt,vo,x_sol):
+	"""
+	calculate the continuum bar vibration solution (mode 1)
 
-	# initial time
-	ti = 0
+	The parameters and the position can be arrays, the solutions have shape
+	(times,) plus the broadcast shape of the arrays
+	"""
 
-	# compute the exact solution
-	while ti<time:
+	# solution times, with one axis per parameter dimension
+	t = tools.time_steps(time,dt)
+	shape = np.broadcast(L,E,rho,vo,x_sol).shape
+	ti = t.reshape(t.shape+(1,)*len(shape))
 
-		# position
-		xt.append(vo/w1*np.sin(w1*ti)*np.sin(b1*x_sol))
+	# frequency of the system (mode 1)
+	w1 = (np.pi/2.0/np.asarray(L))*((np.asarray(E)/rho)**0.5)
+	b1 = (np.pi/2.0/np.asarray(L))
 
-		# velocity
-		vt.append(vo*np.cos(w1*ti)*np.sin(b1*x_sol))
+	# position
+	xt = vo/w1*np.sin(w1*ti)*np.sin(b1*x_sol)
 
-		# current time
-		t.append(ti)
-		
-		# advance in time
-		ti+=dt
+	# velocity
+	vt = vo*np.cos(w1*ti)*np.sin(b1*x_sol)
 
-	return [xt,vt,t]
\ No newline at end of file
+	return [xt,vt,t]
@@ -35,27 +35,27 @@ Fabricio Fernandez <fabricio.hmf@gmail.com>
 # import external modules
 import numpy as np
 
-def single_mass_point_vibration_solution(L,E,rho,time,dt,xo,vo):
-	""" calculate the single mass point vibration solution """
-
-	# frequency of the system
-	w = (1.0/L)*((E/rho)**0.5)
+# import local modules
+from analitical_solutions import analitical_solution_tools as tools
 
-	# mass position in time
-	xt = []
-	t  = []
+@tools.lru_cache()
+def single_mass_point_vibration_solution(L,E,rho,time,dt,xo,vo):
+	"""
+	calculate the single mass point vibration solution
 
-	# initial time
-	ti = 0
+	The parameters can be arrays, the solution has shape (times,) plus the
+	broadcast shape of the arrays
+	"""
 
-	# compute the exact solution
-	while ti<time:
+	# solution times, with one axis per parameter dimension
+	t = tools.time_steps(time,dt)
+	shape = np.broadcast(L,E,rho,xo,vo).shape
+	ti = t.reshape(t.shape+(1,)*len(shape))
 
-		#particle position
-		xt.append(xo*np.exp(vo/(L*w)*np.sin(w*ti)))
+	# frequency of the system
+	w = (1.0/np.asarray(L))*((np.asarray(E)/rho)**0.5)
 
-		t.append(ti)
-		
-		ti+=dt
+	#particle position
+	xt = xo*np.exp(vo/(L*w)*np.sin(w*ti))
 
-	return [xt, t]
\ No newline at end of file
+	return [xt, t]
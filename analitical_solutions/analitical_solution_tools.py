@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+Common tools of the analytical solutions: the time grid and the cache of the
+computed solutions
+"""
+
+# import external modules
+import collections
+import functools
+import inspect
+import numpy as np
+
+# import local modules
+from modules import recorder
+
+def time_steps(time,dt):
+	"""
+	Returns the solution times, the loop times of the explicit solution
+	(see `recorder.time_steps`) from 0 to time (not included)
+	"""
+	t = recorder.time_steps(time,dt)
+
+	return t[t<time]
+
+def cache_key(value):
+	"""returns a hashable key of an argument, arrays are keyed by their values"""
+
+	if isinstance(value,(np.ndarray,list,tuple)):
+		value = np.asarray(value)
+		return (value.shape,value.dtype.str,value.tobytes())
+
+	return value
+
+def lru_cache(maxsize=128):
+	"""
+	Memoizes a function returning a list of arrays, keeping the results of
+	the last `maxsize` arguments. The arrays of the results are read only.
+	"""
+	def decorator(function):
+
+		results = collections.OrderedDict()
+		signature = inspect.signature(function)
+
+		@functools.wraps(function)
+		def cached(*args,**kwargs):
+
+			# arguments in the order of the function parameters
+			args = signature.bind(*args,**kwargs).args
+			key = tuple(cache_key(arg) for arg in args)
+
+			if key in results:
+				results.move_to_end(key)
+				return list(results[key])
+
+			result = function(*args)
+
+			for array in result:
+				array.flags.writeable = False
+
+			results[key] = result
+
+			if len(results) > maxsize:
+				results.popitem(last=False)
+
+			return list(result)
+
+		cached.cache_clear = results.clear
+		cached.cache_size = lambda: len(results)
+
+		return cached
+
+	return decorator
@@ -37,73 +37,51 @@ Fabricio Fernandez <fabricio.hmf@gmail.com>
 # import external modules
 import numpy as np
 
+# import local modules
+from analitical_solutions import analitical_solution_tools as tools
+
+@tools.lru_cache()
 def wave_in_pile_fixed_and_loaded(L,E,rho,time,dt,po,x,n_sum):
-	"""calculate the solution of the wave equation in a pile"""
+	"""
+	calculate the solution of the wave equation in a pile
+
+	The series terms are summed over a (time x term) grid. The parameters and
+	the position can be arrays, the solutions have shape (times,) plus the
+	broadcast shape of the arrays
+	"""
 
 	# Poisson's ratio in 1D is assumed to be equal to 0
 	nu=0
 
 	# bulk modulus
-	K = E*(1-nu)/(1+nu)/(1-2*nu)
+	K = np.asarray(E)*(1-nu)/(1+nu)/(1-2*nu)
 
 	# wave velocity
 	c = np.sqrt(K/rho)
 
-	# position an velocity in time
-	xt = []
-	vt = []
-	t  = []
-
-	# initial time
-	ti = 0
-
-	# compute the exact solution
-	while ti<time:
-		
-		# displacement and velocity summation
-		u_wave_sum = 0
-		v_wave_sum = 0
-        
-		for n in range(1,n_sum):
-
-			lam = (2*n-1)*np.pi/2/L
-			
-			u_wave_sum+=((-1)**n)/((2*n-1)**2)*np.sin(lam*x)*np.cos(lam*c*ti)
-			
-			v_wave_sum-=(-1)**n/((2*n-1)**2)*lam*c*np.sin(lam*x)*np.cos(lam*c*ti)
-		
-		# displacement
-		u_wave = po/K*(x+8*L/(np.pi**2)*u_wave_sum)
-
-		# velocity
-		v_wave = po*8*L/K/np.pi**2*v_wave_sum
-
-		# position
-		xt.append(u_wave+x)
-
-		# velocity
-		vt.append(v_wave)
-
-		# current time
-		t.append(ti)
-		
-		# advance in time
-		ti+=dt
-
-	return [xt,vt,t]
+	# solution times, with one axis per parameter dimension and one axis for the series terms
+	t = tools.time_steps(time,dt)
+	shape = np.broadcast(L,E,rho,po,x).shape
+	ti = t.reshape(t.shape+(1,)*(len(shape)+1))
 
+	# series terms in the last axis
+	n = np.arange(1,n_sum)
+	lam = (2*n-1)*np.pi/2/np.expand_dims(L,-1)
+	sign = (-1.0)**n/((2*n-1)**2)
+	x_n = np.expand_dims(x,-1)
+	c_n = np.expand_dims(c,-1)
 
+	# displacement and velocity summation
+	u_wave_sum = np.sum(sign*np.sin(lam*x_n)*np.cos(lam*c_n*ti),axis=-1)
+	v_wave_sum = -np.sum(sign*lam*c_n*np.sin(lam*x_n)*np.cos(lam*c_n*ti),axis=-1)
 
-## test
+	# displacement
+	u_wave = po/K*(x+8*L/(np.pi**2)*u_wave_sum)
 
-# external modules
-#import matplotlib.pyplot as plt # for plot
+	# velocity
+	v_wave = po*8*L/K/np.pi**2*v_wave_sum
 
-#[anal_xt,anal_vt, anal_t] = wave_in_pile_fixed_and_loaded(L=1,E=150,rho=1,time=0.5,dt=0.1,po=-0.1,x=0.005)
-#plt.plot(anal_t,anal_xt,'r',linewidth=2,label='analytical')
+	# position
+	xt = u_wave+x
 
-# configure axis, legends and show plot
-#plt.xlabel('time (s)')
-#plt.ylabel('position (m)')
-#plt.legend()
-#plt.show()
+	return [xt,v_wave,t]
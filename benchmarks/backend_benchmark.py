@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+This benchmark measures the time steps per second of the wave in pile problem
+(see `verification_problems/mpm_wave_in_pile.py`) using the numpy and the
+numba backends, for 1e4, 1e5 and 1e6 particles, against a reference time step
+looping over particle, element and node objects (`particle.material_point`,
+`element.bar_1D` and `node.node_1D`), as the solver did before the numpy and
+numba backends.
+
+Run this benchmark as:
+
+    python backend_benchmark.py [number of steps]
+
+All the backends are measured over the same number of steps. The first numba
+step includes the compilation and is not measured, and neither is the creation
+of the objects of the object loop.
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import time
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+from modules import jit # for verifying numba
+from modules import shape # for the interpolation functions of the object loop
+from modules import particle # for the particle objects of the object loop
+from modules import node # for the node objects of the object loop
+from modules import element # for the element objects of the object loop
+
+def object_model(msh):
+    """
+    Returns the nodes, elements and particles of a mesh as lists of
+    `node.node_1D`, `element.bar_1D` and `particle.material_point` objects,
+    holding python floats
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    nodes=[]
+    for i in range(len(msh.nodes)):
+        inode=node.node_1D()
+        inode.id=i
+        inode.x=float(msh.nodes.x[i])
+        nodes.append(inode)
+
+    elements=[]
+    for i in range(msh.nelem):
+        ie=element.bar_1D()
+        ie.id=i
+        ie.n1=nodes[msh.connectivity[i,0]]
+        ie.n2=nodes[msh.connectivity[i,1]]
+        ie.L=ie.n2.x-ie.n1.x
+        elements.append(ie)
+
+    p=msh.particles
+    particles=[]
+    for i in range(len(p)):
+        ip=particle.material_point(float(p.mass[i]),p.materials[p.material_id[i]],float(p.position[i]))
+        ip.id=i
+        ip.density=float(p.density[i])
+        ip.velocity=float(p.velocity[i])
+        ip.stress=float(p.stress[i])
+        ip.f_ext=float(p.f_ext[i])
+        particles.append(ip)
+
+    return nodes,elements,particles
+
+def object_loop_solution(nodes,elements,particles,msetup):
+    """
+    Solves the problem looping over the particle, element and node objects,
+    as the solver did before the numpy and numba backends (USF scheme and
+    linear interpolation functions)
+
+    The particles are located from the element index of its position, the
+    original search over all the elements for each particle is not measured.
+
+    Arguments
+    ---------
+    nodes, elements, particles: list
+        node, element and particle objects, see `object_model`
+
+    msetup : model_setup
+        a model_setup object containing the model options
+    """
+    loop_counter=1
+    it=0
+    dt=msetup.dt
+    x0=elements[0].n1.x
+    L=elements[0].L
+
+    while it<=msetup.time:
+
+        dt_momentum=dt/2.0 if loop_counter==1 else dt
+
+        # particles in each element
+        particles_in_element=[[] for ie in elements]
+        for ip in particles:
+            ie=elements[min(max(int((ip.position-x0)/L),0),len(elements)-1)]
+            ip.element=ie
+            particles_in_element[ie.id].append(ip)
+
+        # interpolation functions values
+        for ip in particles:
+            ie=ip.element
+            ip.N1=shape.NiLinear(ip.position,ie.n1.x,ie.L)
+            ip.N2=shape.NiLinear(ip.position,ie.n2.x,ie.L)
+            ip.dN1=shape.dNiLinear(ip.position,ie.n1.x,ie.L)
+            ip.dN2=shape.dNiLinear(ip.position,ie.n2.x,ie.L)
+
+        # particle mass and momentum to nodes
+        for ie in elements:
+            for ip in particles_in_element[ie.id]:
+                ie.n1.mass+=ip.mass*ip.N1
+                ie.n2.mass+=ip.mass*ip.N2
+                ie.n1.momentum+=ip.mass*ip.velocity*ip.N1
+                ie.n2.momentum+=ip.mass*ip.velocity*ip.N2
+
+        # fixed node
+        elements[0].n1.momentum=0
+
+        # nodal velocity
+        for inode in nodes:
+            if inode.mass!=0:
+                inode.velocity=inode.momentum/inode.mass
+
+        # particle strain increment, density and stress
+        for ip in particles:
+            ie=ip.element
+            ip.dstrain=(ip.dN1*ie.n1.velocity+ip.dN2*ie.n2.velocity)*dt
+            ip.density=ip.density/(1+ip.dstrain)
+            ip.material.update_stress(ip,dt)
+
+        # particle internal and external forces to nodes
+        for ie in elements:
+            for ip in particles_in_element[ie.id]:
+                ie.n1.f_int-=ip.dN1*ip.stress*ip.mass/ip.density
+                ie.n2.f_int-=ip.dN2*ip.stress*ip.mass/ip.density
+                ie.n1.f_ext+=ip.N1*ip.f_ext
+                ie.n2.f_ext+=ip.N2*ip.f_ext
+
+        # total nodal force and nodal momentum
+        for inode in nodes:
+            inode.f_tot=inode.f_int+inode.f_ext+inode.f_damp
+
+        elements[0].n1.f_tot=0
+
+        for inode in nodes:
+            inode.momentum+=inode.f_tot*dt_momentum
+
+        # particle velocity and position
+        for ip in particles:
+            ie=ip.element
+            ip.velocity+=(ie.n1.f_tot/ie.n1.mass*ip.N1+ie.n2.f_tot/ie.n2.mass*ip.N2)*dt_momentum
+            ip.position+=(ie.n1.momentum/ie.n1.mass*ip.N1+ie.n2.momentum/ie.n2.mass*ip.N2)*dt
+
+        # reset nodal values
+        for inode in nodes:
+            inode.velocity=0
+            inode.mass=0
+            inode.momentum=0
+            inode.f_int=0
+            inode.f_ext=0
+            inode.f_tot=0
+
+        msetup.solution_array[0].append(it)
+        msetup.solution_array[1].append(particles[msetup.solution_particle].position)
+
+        loop_counter+=1
+        it+=dt
+
+def wave_in_pile(nparticles,backend,nsteps):
+    """
+    Returns the time steps per second of the wave in pile problem
+
+    Arguments
+    ---------
+    nparticles: int
+        number of particles
+
+    backend: string
+        solver backend, 'numpy' or 'numba', or 'objects' for the object loop
+
+    nsteps: int
+        number of time steps
+    """
+    # pile length
+    L=15
+
+    # create an 1D mesh with 2 particles per element
+    msh = mesh.mesh_1D(L=L,nelem=nparticles//2)
+
+    # define a linear material 
+    elastic = material.linear_elastic(E=100e6,density=2500)
+
+    # put particles in mesh element and set the material
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+
+    # external force
+    msh.particles[-1].f_ext=-10e3
+
+    # setup the model
+    msetup = setup.model_setup()
+    msetup.interpolation_type="linear"
+    msetup.integration_scheme="USF"
+    msetup.backend=backend if backend!='objects' else 'numpy'
+    msetup.dt=0.5*msh.elements[0].L/(elastic.E/elastic.density)**0.5
+    msetup.time=(nsteps-1)*msetup.dt
+
+    # solve the problem in time
+    if backend=='objects':
+        nodes,elements,particles=object_model(msh)
+        start=time.perf_counter()
+        object_loop_solution(nodes,elements,particles,msetup)
+    else:
+        start=time.perf_counter()
+        solver.explicit_solution(msh,msetup)
+    elapsed=time.perf_counter()-start
+
+    return len(msetup.solution_array[0])/elapsed
+
+# number of steps of each run
+nsteps = int(sys.argv[1]) if len(sys.argv)>1 else 20
+
+backends = ['objects','numpy','numba'] if jit.available else ['objects','numpy']
+
+# compile the numba kernels
+if jit.available:
+    wave_in_pile(100,'numba',2)
+
+print('%12s'%'particles'+''.join('%14s'%b for b in backends)+'   (steps/s)')
+
+for nparticles in [10**4,10**5,10**6]:
+
+    rates=[wave_in_pile(nparticles,b,nsteps) for b in backends]
+    
+    print('%12d'%nparticles+''.join('%14.4g'%r for r in rates))
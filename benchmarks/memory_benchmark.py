@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+This benchmark measures the memory of the particle, node and element objects,
+with and without `__slots__`, for 1e6 objects, and of the particle and node
+arrays of a mesh with 1e6 particles.
+
+Run this benchmark as:
+
+    python memory_benchmark.py
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import tracemalloc
+
+# local modules
+from modules import particle # for particle definition
+from modules import node # for node definition
+from modules import element # for element definition
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+
+# number of objects
+n = 1000000
+
+def without_slots(cls):
+    """returns a class with the same constructor storing the attributes in a __dict__"""
+    return type(cls.__name__, (), {'__init__': cls.__init__})
+
+def bytes_per_object(create):
+    """returns the memory allocated by `create` divided by the number of objects"""
+    tracemalloc.start()
+    objects = create()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size/n
+
+elastic = material.linear_elastic(E=100, density=1)
+
+# objects without and with __slots__ (including the list referencing them)
+for name, cls, create in [('particle', particle.material_point, lambda cls: [cls(1.0, elastic, 0.5*i) for i in range(n)]),
+                          ('node', node.node_1D, lambda cls: [cls() for i in range(n)]),
+                          ('element', element.bar_1D, lambda cls: [cls() for i in range(n)])]:
+
+    before = bytes_per_object(lambda: create(without_slots(cls)))
+    after = bytes_per_object(lambda: create(cls))
+
+    print('%s objects: %.0f bytes per %s without __slots__, %.0f bytes with __slots__' % (cls.__name__, before, name, after))
+
+# particle and node arrays of a mesh
+msh = mesh.mesh_1D(L=n, nelem=n//2)
+msh.put_particles_in_all_mesh_elements(ppelem=2, material=elastic)
+
+particle_bytes = sum(getattr(msh.particles, name).nbytes for name in msh.particles.fields)
+particle_bytes += msh.particles.element.nbytes + msh.particles.material_id.nbytes
+node_bytes = sum(getattr(msh.nodes, name).nbytes for name in msh.nodes.fields)
+
+print('particle arrays: %.0f bytes per particle' % (particle_bytes/len(msh.particles)))
+print('node arrays: %.0f bytes per node' % (node_bytes/len(msh.nodes)))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module defines a class representing the nodal boundary conditions
+
+"""
+
+import numpy as np
+
+class boundary_conditions:
+    """
+    Represent the boundary conditions of the nodes of a mesh, stored as
+    node index and value arrays
+
+    A fixed node is a node with prescribed velocity equal to zero. A node
+    can have one prescribed velocity and one prescribed force, prescribing
+    it again replaces the previous value.
+
+    Arguments
+    ---------
+    batch: int
+        number of batch cases, or None
+
+    Attributes
+    ----------
+    velocity_nodes : array
+        nodes with prescribed velocity
+
+    velocity_values : array
+        prescribed velocity, with shape (nodes,) or (batch, nodes)
+
+    force_nodes : array
+        nodes with prescribed external force
+
+    force_values : array
+        prescribed external force, with shape (nodes,) or (batch, nodes)
+    """
+    def __init__(self, batch=None):
+
+        self.batch = batch
+        self.velocity_nodes = np.zeros(0, dtype=int)
+        self.velocity_values = np.zeros(self.shape(0))
+        self.force_nodes = np.zeros(0, dtype=int)
+        self.force_values = np.zeros(self.shape(0))
+
+    def shape(self, n):
+        """
+        Returns the shape of the value arrays
+
+        Arguments
+        ---------
+        n: int
+            number of nodes
+        """
+        return (n,) if self.batch is None else (self.batch, n)
+
+    def _merge(self, nodes, values, current_nodes, current_values):
+        """
+        Returns the node and value arrays with the new nodes and values,
+        replacing the values of the nodes already in the arrays
+
+        Arguments
+        ---------
+        nodes: int or list
+            node indices
+
+        values: float or array
+            a value for all nodes or one value per node. In batched meshes
+            a 1D array has one value per case, and values per node have
+            shape (1, nodes) or (batch, nodes)
+
+        current_nodes: array
+            current node indices
+
+        current_values: array
+            current values
+        """
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=int))
+
+        if len(np.unique(nodes)) != len(nodes):
+            raise ValueError("repeated nodes in the boundary condition")
+
+        values = np.asarray(values, dtype=float)
+
+        # values per batch case
+        if self.batch is not None and values.ndim == 1:
+            values = values[:, None]
+
+        values = np.broadcast_to(values, self.shape(len(nodes)))
+
+        keep = ~np.isin(current_nodes, nodes)
+
+        return (np.concatenate((current_nodes[keep], nodes)),
+                np.concatenate((current_values[..., keep], values), axis=-1))
+
+    def fix(self, nodes):
+        """
+        Fixes nodes, prescribing a zero velocity
+
+        Arguments
+        ---------
+        nodes: int or list
+            node indices
+        """
+        self.prescribe_velocity(nodes, 0)
+
+    def prescribe_velocity(self, nodes, values):
+        """
+        Prescribes the velocity of nodes
+
+        Arguments
+        ---------
+        nodes: int or list
+            node indices
+
+        values: float or array
+            prescribed velocity, see `_merge`
+        """
+        self.velocity_nodes, self.velocity_values = self._merge(nodes, values, self.velocity_nodes, self.velocity_values)
+
+    def prescribe_force(self, nodes, values):
+        """
+        Prescribes an external force in nodes
+
+        Arguments
+        ---------
+        nodes: int or list
+            node indices
+
+        values: float or array
+            prescribed force, see `_merge`
+        """
+        self.force_nodes, self.force_values = self._merge(nodes, values, self.force_nodes, self.force_values)
+
+    def free(self, nodes=None):
+        """
+        Removes the boundary conditions of nodes
+
+        Arguments
+        ---------
+        nodes: int or list
+            node indices, by default all nodes
+        """
+        if nodes is None:
+            self.__init__(self.batch)
+            return
+
+        keep = ~np.isin(self.velocity_nodes, nodes)
+        self.velocity_nodes = self.velocity_nodes[keep]
+        self.velocity_values = self.velocity_values[..., keep]
+
+        keep = ~np.isin(self.force_nodes, nodes)
+        self.force_nodes = self.force_nodes[keep]
+        self.force_values = self.force_values[..., keep]
+
+    @property
+    def nodes(self):
+        """
+        Nodes with boundary conditions
+        """
+        return np.union1d(self.velocity_nodes, self.force_nodes)
+
+    def apply_momentum(self, nodes):
+        """
+        Imposes the nodal momentum of the prescribed velocity (mv=m*v)
+
+        Arguments
+        ---------
+        nodes: node_set
+            the nodes of the mesh
+        """
+        index = self.velocity_nodes
+        nodes.momentum[..., index] = nodes.mass[..., index]*self.velocity_values
+
+    def apply_velocity(self, nodes):
+        """
+        Imposes the prescribed nodal velocity and its nodal momentum
+
+        Arguments
+        ---------
+        nodes: node_set
+            the nodes of the mesh
+        """
+        index = self.velocity_nodes
+        nodes.velocity[..., index] = self.velocity_values
+        nodes.momentum[..., index] = nodes.mass[..., index]*self.velocity_values
+
+    def apply_total_force(self, nodes):
+        """
+        Imposes a zero total force in the nodes with prescribed velocity (f=m*a=0)
+
+        Arguments
+        ---------
+        nodes: node_set
+            the nodes of the mesh
+        """
+        nodes.f_tot[..., self.velocity_nodes] = 0
+
+    def apply_external_force(self, nodes):
+        """
+        Adds the prescribed force to the nodal external force
+
+        Arguments
+        ---------
+        nodes: node_set
+            the nodes of the mesh
+        """
+        nodes.f_ext[..., self.force_nodes] += self.force_values
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module writes and reads checkpoints of the explicit solution
+
+A checkpoint is a compressed npz file with the particle and nodal arrays, the
+loop time and counter, and the recorder buffers. The model is restarted
+building the same mesh, materials and model setup, and solving it with the
+checkpoint file in the `resume_from` argument of `solver.explicit_solution`.
+
+"""
+
+import os
+
+import numpy as np
+
+def save(path, msh, msetup, rec, loop_counter, it):
+    """
+    Writes a checkpoint of the explicit solution
+
+    The file is written to a temporary file and renamed, so an interrupted
+    write keeps the previous checkpoint.
+
+    Arguments
+    ---------
+    path: string
+        checkpoint file name
+
+    msh: mesh
+        a mesh object
+
+    msetup : model_setup
+        a model_setup object containing the model options
+
+    rec: recorder
+        the recorder of the solution
+
+    loop_counter: int
+        counter of the next loop
+
+    it: float
+        time of the next loop
+    """
+    p = msh.particles
+    n = msh.nodes
+
+    data = {'loop_counter': loop_counter, 'it': it, 'dt': msetup.dt,
+            'particle_element': p.element, 'particle_material_id': p.material_id,
+            'particle_ids': p.particle_id(np.arange(len(p))),
+            'recorder_step': rec.step, 'recorder_count': rec.count,
+            'recorder_stride': rec.stride, 'recorder_particles': rec.particles,
+            'recorder_time': rec.time[:rec.count]}
+
+    for name in p.fields:
+        data['particle_'+name] = getattr(p, name)
+
+    for name in n.fields:
+        data['node_'+name] = getattr(n, name)
+
+    for field in rec.fields:
+        data['recorder_'+field] = rec[field][:rec.count]
+
+    temporary = path+'.tmp'
+
+    with open(temporary, 'wb') as f:
+        np.savez_compressed(f, **data)
+
+    os.replace(temporary, path)
+
+def load(path, msh, msetup, rec):
+    """
+    Reads a checkpoint into the mesh and the recorder, returning the loop
+    counter and the time of the next loop
+
+    Arguments
+    ---------
+    path: string
+        checkpoint file name
+
+    msh: mesh
+        a mesh object built as in the checkpointed model
+
+    msetup : model_setup
+        a model_setup object containing the model options
+
+    rec: recorder
+        the recorder of the solution, already started
+    """
+    p = msh.particles
+    n = msh.nodes
+
+    with np.load(path) as data:
+
+        if data['particle_mass'].shape != p.mass.shape or data['node_mass'].shape != n.mass.shape:
+            raise ValueError("the checkpoint %s does not match the number of particles and nodes of the mesh" % path)
+
+        if not msetup.adaptive_dt and data['dt'] != msetup.dt:
+            raise ValueError("the checkpoint %s was computed with a time step of %g" % (path, data['dt']))
+
+        if (data['recorder_stride'] != rec.stride or not np.array_equal(data['recorder_particles'], rec.particles)
+                or any('recorder_'+field not in data for field in rec.fields)):
+            raise ValueError("the checkpoint %s was recorded with other particles, fields or stride" % path)
+
+        for name in p.fields:
+            getattr(p, name)[...] = data['particle_'+name]
+
+        for name in n.fields:
+            getattr(n, name)[...] = data['node_'+name]
+
+        p.element[...] = data['particle_element']
+        p.material_id = data['particle_material_id']
+
+        # particle arrays sorted by element in the checkpointed solution
+        ids = data['particle_ids']
+        if p.ids is not None or not np.array_equal(ids, np.arange(len(p))):
+            p.set_ids(ids)
+
+        count = int(data['recorder_count'])
+        rec.reserve(count)
+
+        rec.step = int(data['recorder_step'])
+        rec.count = count
+        rec.time[:count] = data['recorder_time']
+
+        for field in rec.fields:
+            rec[field][:count] = data['recorder_'+field]
+
+        return int(data['loop_counter']), float(data['it'])
@@ -25,10 +25,8 @@ class bar_1D:
 
 	L : float
 		Element length
-
-	particles : list
-		List of particles in the element
 	"""
+	__slots__ = ('id', 'n1', 'n2', 'L')
 
 	def __init__(self):
 		
@@ -36,4 +34,73 @@ class bar_1D:
 		self.n1 = 0  # node 1 (left)
 		self.n2 = 0  # node 2 (right)
 		self.L = 0   # element length
-		self.particles = [] # list of particles in element
\ No newline at end of file
+class element_view:
+
+	"""
+	Represent an element of a mesh stored in the mesh arrays.
+
+	It exposes the same attributes as `bar_1D`, reading the connectivity,
+	the nodes and the element length of the mesh.
+
+	Attributes
+	----------
+
+	id : int
+		Element identification (index in the mesh)
+	"""
+	__slots__ = ('_mesh', '_index')
+
+	def __init__(self, msh, index):
+
+		self._mesh = msh
+		self._index = index
+
+	@property
+	def id(self):
+		return self._index
+
+	@property
+	def n1(self):
+		return self._mesh.nodes[self._mesh.connectivity[self._index,0]]
+
+	@property
+	def n2(self):
+		return self._mesh.nodes[self._mesh.connectivity[self._index,1]]
+
+	@property
+	def L(self):
+		return self._mesh.element_length[self._index]
+
+class element_set:
+
+	"""
+	Represent the elements of a mesh, stored as the connectivity and the
+	element length arrays of the mesh. The element objects are created
+	when the elements are indexed or iterated.
+
+	Arguments
+	---------
+
+	msh : mesh
+		the mesh of the elements
+	"""
+
+	def __init__(self, msh):
+
+		self._mesh = msh
+
+	def __len__(self):
+		return len(self._mesh.connectivity)
+
+	def __getitem__(self, i):
+
+		index = range(len(self))[i]
+
+		if isinstance(index, range):
+			return [element_view(self._mesh, ie) for ie in index]
+
+		return element_view(self._mesh, index)
+
+	def __iter__(self):
+		for ie in range(len(self)):
+			yield element_view(self._mesh, ie)
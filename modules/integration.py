@@ -7,6 +7,10 @@ This module defines integration nodal functions
 
 """
 
+import numpy as np
+
+from modules import particle
+
 def total_force_in_nodes(msh, msetup):
     """
     Calculate total forces in nodes
@@ -17,32 +21,41 @@ def total_force_in_nodes(msh, msetup):
         a mesh object
     """
 
+    n=msh.nodes
+    act=msh.active_nodes
+
+    # nodal forces of the active nodes
+    f_int = n.f_int[...,act]
+    f_ext = n.f_ext[...,act]
+    f_damp = n.f_damp[...,act]
+
     # add damping force if needed
-    if msetup.damping_local_alpha>0:
+    if np.any(np.asarray(msetup.damping_local_alpha)>0):
         
-        # add damping force in nodes
-        for node in msh.nodes:
-            
-            # damping factor
-            alpha = msetup.damping_local_alpha
+        # nodal mass
+        mass = n.mass[...,act]
+
+        # damping factor
+        alpha = np.broadcast_to(particle.batch_values(msetup.damping_local_alpha),mass.shape)
 
-            # unbalanced nodal force magnitude
-            unbalanced_force_mag = abs(node.f_int + node.f_ext)
+        # unbalanced nodal force magnitude
+        unbalanced_force_mag = abs(f_int + f_ext)
 
-            # nodal velocity
-            nodal_vel = node.momentum/node.mass
+        # nodal velocity
+        nodal_vel = np.divide(n.momentum[...,act],mass,out=np.zeros(mass.shape),where=mass!=0)
 
-            if abs(nodal_vel)!=0:
+        # nodes in movement
+        moving = abs(nodal_vel)!=0
 
-                # velocity direction
-                vel_direction = nodal_vel/abs(nodal_vel)
-                
-                # damping force proportional to unbalanced forces and opposite to the nodal velocity
-                node.f_damp = - alpha * unbalanced_force_mag * vel_direction
+        # velocity direction
+        vel_direction = nodal_vel[moving]/abs(nodal_vel[moving])
+        
+        # damping force proportional to unbalanced forces and opposite to the nodal velocity
+        f_damp[moving] = - alpha[moving] * unbalanced_force_mag[moving] * vel_direction
+        n.f_damp[...,act] = f_damp
 
     # total nodal force
-    for node in msh.nodes:
-        node.f_tot = node.f_int + node.f_ext + node.f_damp
+    n.f_tot[...,act] = f_int + f_ext + f_damp
                   
 def momentum_in_nodes(msh,dt):
     """
@@ -56,5 +69,5 @@ def momentum_in_nodes(msh,dt):
     dt: float
         time step
     """
-    for inode in msh.nodes:
-        inode.momentum += inode.f_tot*dt
\ No newline at end of file
+    act=msh.active_nodes
+    msh.nodes.momentum[...,act]+=msh.nodes.f_tot[...,act]*dt
@@ -15,8 +15,182 @@ $$f_I$$: is a nodal quantity,
 $$f_p$$: is a particle quantity, and
 $$N_I(x_p)$$: is the weight or interpolation function of the node *I* evaluated at particle position $$x_p$$
 
+The sums are evaluated for all particles at once by scattering the particle
+contributions to the nodes of the particle element, in the same order as
+a loop over the elements and its particles.
+
 """
+
+import numpy as np
+
+from modules import threads
 	
+def scatter_to_nodes(msh,weights):
+	"""
+	Sums particle contributions in the nodes of the particle element.
+
+	The node index of the contributions is built once, and used to sum
+	each quantity with `np.bincount`. The contributions to node 2 are added
+	before the ones to node 1, so each nodal sum is accumulated in the same
+	order as looping over the elements and its particles. With several
+	threads (`msh.threads`) each thread sums a range of particles and the
+	sums are added in the order of the ranges.
+
+	Arguments
+	---------
+	msh: mesh
+		a mesh object
+	weights: array
+		particle contributions to node 2 (`weights[...,0,:]`) and to node 1
+		(`weights[...,1,:]`) of its element, one row per quantity
+
+	Returns
+	-------
+	array with the nodal sums, one row per quantity
+	"""
+	nq=len(weights)
+	shape=msh.nodes.mass.shape
+	size=msh.nodes.mass.size
+	element=msh.particles.element
+
+	# index of each batch case in the nodal sums
+	shift=np.arange(size,step=shape[-1]).reshape(shape[:-1]+(1,))
+
+	def scatter(chunk):
+
+		# node 2 and node 1 of each particle of the range, shared by all quantities
+		conn=msh.connectivity[element[...,chunk]]
+		index=np.empty(conn.shape[:-2]+(2,conn.shape[-2]),dtype=conn.dtype)
+		np.add(conn[...,1],shift,out=index[...,0,:])
+		np.add(conn[...,0],shift,out=index[...,1,:])
+		index=index.ravel()
+
+		# nodal sums of a range of particles, in a private buffer
+		nodal=np.empty((nq,size))
+
+		for i in range(nq):
+			nodal[i]=np.bincount(index,weights[i][...,chunk].ravel(),minlength=size)
+
+		return nodal
+
+	return threads.sum_chunks(scatter,element.shape[-1],msh.threads).reshape((nq,)+shape)
+
+def segmented_scatter_to_nodes(msh,w1,w2):
+	"""
+	Sums particle contributions in the nodes of the particle element, for
+	particle arrays ordered by element.
+
+	The contributions of each segment of consecutive particles in the same
+	element are summed with `np.add.reduceat` (in double precision), and
+	then added to the nodes of the element, the nodes i and i+1 of the
+	element i.
+
+	Arguments
+	---------
+	msh: mesh
+		a mesh object, with `particles_sorted`
+	w1: array
+		particle contributions to node 1 of its element, one row per quantity
+	w2: array
+		particle contributions to node 2 of its element, one row per quantity
+
+	Returns
+	-------
+	array with the nodal sums, one row per quantity
+	"""
+	keys=msh.element_keys()
+	nodal=np.zeros((len(w1),len(msh.nodes)))
+
+	if len(keys)==0:
+		return nodal
+
+	# first particle and element of each segment (the particles outside the mesh are not added)
+	starts=np.flatnonzero(np.concatenate(([True],keys[1:]!=keys[:-1])))
+	elem=keys[starts]
+	inside=elem<msh.nelem
+
+	# sums of each element, added to its nodes i and i+1
+	sums=np.zeros((2,len(w1),msh.nelem))
+	sums[0][:,elem[inside]]=np.add.reduceat(w1,starts,axis=-1,dtype=float)[:,inside]
+	sums[1][:,elem[inside]]=np.add.reduceat(w2,starts,axis=-1,dtype=float)[:,inside]
+
+	nodal[:,1:]+=sums[1]
+	nodal[:,:-1]+=sums[0]
+
+	return nodal
+
+def particles_to_nodes(msh,quantities=('mass','momentum','f_int','f_ext')):
+	"""
+	Interpolate quantities from particles to nodes, filling the contributions of
+	all quantities in one buffer summed with a single node index.
+
+	Arguments
+	---------
+	msh: mesh
+		a mesh object
+	quantities: tuple
+		nodal quantities to interpolate, can be 'mass', 'momentum',
+		'f_int' (internal force) and 'f_ext' (external force)
+	"""
+	p=msh.particles
+
+	# contributions to node 2 and node 1 of all quantities, filled in place
+	weights=np.empty((len(quantities),)+p.mass.shape[:-1]+(2,p.mass.shape[-1]),
+					 dtype=np.result_type(p.mass,p.velocity,p.stress,p.density,p.f_ext,p.N1,p.dN1))
+
+	for w,q in zip(weights,quantities):
+
+		w1=w[...,1,:]
+		w2=w[...,0,:]
+
+		if q=='mass':
+			np.multiply(p.mass,p.N1,out=w1)
+			np.multiply(p.mass,p.N2,out=w2)
+
+		elif q=='momentum':
+			np.multiply(p.mass,p.velocity,out=w1)
+			np.multiply(w1,p.N2,out=w2)
+			w1*=p.N1
+
+		elif q=='f_int':
+			np.multiply(p.dN1,p.stress,out=w1)
+			w1*=p.mass
+			w1/=p.density
+			np.multiply(p.dN2,p.stress,out=w2)
+			w2*=p.mass
+			w2/=p.density
+
+		elif q=='f_ext':
+			np.multiply(p.N1,p.f_ext,out=w1)
+			np.multiply(p.N2,p.f_ext,out=w2)
+
+		else:
+			raise ValueError("unknown nodal quantity '%s'"%q)
+
+	# particles outside the mesh are not interpolated
+	if msh.particles_outside is not None:
+		weights[...,0,:][:,msh.particles_outside]=0
+		weights[...,1,:][:,msh.particles_outside]=0
+
+	# particles ordered by element are summed by segments
+	if msh.particles_sorted and msh.threads==1:
+		nodal=segmented_scatter_to_nodes(msh,weights[...,1,:],weights[...,0,:])
+	else:
+		nodal=scatter_to_nodes(msh,weights)
+
+	for q,value in zip(quantities,nodal):
+
+		# internal forces are opposite to the particle stress divergence
+		if q=='f_int':
+			msh.nodes.f_int-=value
+
+		else:
+			getattr(msh.nodes,q)[:]+=value
+
+	# add the contributions of the neighbour subdomains to the boundary nodes
+	if msh.halo is not None:
+		msh.halo(quantities)
+
 def mass_to_nodes(msh):
 	"""
 	Interpolate mass from particles to nodes.
@@ -26,12 +200,7 @@ def mass_to_nodes(msh):
 	msh: mesh
 		a mesh object
 	"""
-	for ie in msh.elements:
-		for ip in ie.particles:
-
-			ie.n1.mass+=ip.mass*ip.N1
-			ie.n2.mass+=ip.mass*ip.N2
-	
+	particles_to_nodes(msh,('mass',))
 	
 def momentum_to_nodes(msh):
 	"""
@@ -42,12 +211,7 @@ def momentum_to_nodes(msh):
 	msh: mesh
 		a mesh object
 	"""  
-	for ie in msh.elements:
-		for ip in ie.particles:
-			
-			ie.n1.momentum+=ip.mass*ip.velocity*ip.N1
-			ie.n2.momentum+=ip.mass*ip.velocity*ip.N2    
-			
+	particles_to_nodes(msh,('momentum',))
 			
 def internal_force_to_nodes(msh):
 	"""
@@ -58,11 +222,7 @@ def internal_force_to_nodes(msh):
 	msh: mesh
 		a mesh object
 	"""   
-	for ie in msh.elements:
-		for ip in ie.particles:
-			
-			ie.n1.f_int-=ip.dN1*ip.stress*ip.mass/ip.density
-			ie.n2.f_int-=ip.dN2*ip.stress*ip.mass/ip.density
+	particles_to_nodes(msh,('f_int',))
 
 def external_force_to_nodes(msh):
 	"""
@@ -73,8 +233,4 @@ def external_force_to_nodes(msh):
 	msh: mesh
 		a mesh object
 	"""
-	for ie in msh.elements:
-		for ip in ie.particles:
-		
-			ie.n1.f_ext+=ip.N1*ip.f_ext
-			ie.n2.f_ext+=ip.N2*ip.f_ext
\ No newline at end of file
+	particles_to_nodes(msh,('f_ext',))
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module defines a compiled backend computing a whole time step of the
+explicit solution in fused loops over particles and nodes.
+
+The loops are compiled with numba when it is installed. The backend is
+selected with `model_setup.backend="numba"`; when numba is not installed, or
+a material has no compiled stress update, the solver uses the NumPy functions
+of the `update`, `interpolation` and `integration` modules.
+
+The operations are done in the same order as in the NumPy functions, so
+both backends give identical results.
+
+"""
+
+import warnings
+
+import numpy as np
+
+from modules import material
+
+try:
+    from numba import njit
+    available = True
+
+except ImportError:
+    available = False
+
+    def njit(*args, **kwargs):
+        """Leaves the function uncompiled when numba is not installed"""
+        return lambda f: f
+
+# integration scheme codes
+USF, USL, MUSL = 0, 1, 2
+
+# interpolation type codes
+LINEAR, CPGIMP = 0, 1
+
+# material codes
+LINEAR_ELASTIC, NEWTONIAN_FLUID = 0, 1
+
+schemes = {'USF': USF, 'USL': USL, 'MUSL': MUSL}
+interpolations = {'linear': LINEAR, 'cpGIMP': CPGIMP}
+
+def material_arrays(msh):
+    """
+    Returns the material code and the material parameter of each particle,
+    or None if some material has no compiled stress update
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    kind = []
+    param = []
+
+    for imat in msh.particles.materials:
+
+        if isinstance(imat, material.linear_elastic):
+            kind.append(LINEAR_ELASTIC)
+            param.append(imat.E)
+
+        elif isinstance(imat, material.newtonian_fluid):
+            kind.append(NEWTONIAN_FLUID)
+            param.append(imat.mu)
+
+        else:
+            return None
+
+    mid = msh.particles.material_id
+
+    return [np.array(kind, dtype=np.int64)[mid], np.array(param, dtype=float)[mid]]
+
+def use_backend(msh, msetup):
+    """
+    Verifies if the compiled backend is used in the solution and returns the
+    particle material arrays, or None to use the NumPy functions
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+
+    msetup : model_setup
+        a model_setup object containing the model options
+    """
+    if msetup.backend == "numpy":
+        return None
+
+    if msetup.backend != "numba":
+        raise ValueError("unknown backend '%s', can be 'numpy' or 'numba'" % msetup.backend)
+
+    if not available:
+        warnings.warn("numba is not installed, using the numpy backend")
+        return None
+
+    if msh.batch is not None:
+        warnings.warn("batched meshes are not compiled, using the numpy backend")
+        return None
+
+    materials = material_arrays(msh)
+
+    if materials is None:
+        warnings.warn("material without compiled stress update, using the numpy backend")
+
+    return materials
+
+def explicit_step(msh, msetup, dt_momentum, materials):
+    """
+    Calculates one time step of the explicit solution with compiled loops
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+
+    msetup : model_setup
+        a model_setup object containing the model options
+
+    dt_momentum: float
+        time step used to integrate the nodal momentum and the particle velocity
+
+    materials: list
+        particle material codes and parameters from `material_arrays`
+    """
+    p = msh.particles
+    n = msh.nodes
+
+    if len(msh.element_particles) != len(p):
+        msh.element_particles = np.zeros(len(p), dtype=int)
+
+    outside = np.zeros(len(p), dtype=bool)
+
+    _explicit_step(p.mass, p.position, p.velocity, p.stress, p.density, p.dstrain,
+                             p.f_ext, p.size, p.N1, p.N2, p.dN1, p.dN2, p.element,
+                             materials[0], materials[1],
+                             n.x, n.velocity, n.mass, n.momentum, n.f_int, n.f_ext, n.f_tot, n.f_damp,
+                             msh.connectivity, msh.le if msh.le is not None else 0.0, msh.element_length,
+                             msh.element_offsets, msh.element_particles, outside,
+                             msh.boundary.velocity_nodes, msh.boundary.velocity_values,
+                             msh.boundary.force_nodes, msh.boundary.force_values,
+                             schemes[msetup.integration_scheme],
+                             interpolations[msetup.interpolation_type],
+                             msetup.dt, dt_momentum, msetup.damping_local_alpha)
+
+    msh.particles_outside = outside if np.any(outside) else None
+
+@njit(error_model='numpy')
+def _linear(s, L):
+    """linear interpolation function and gradient, see `shape.linear_functions`"""
+
+    if abs(s) >= L:
+        return 0.0, 0.0
+
+    if s <= 0:
+        return 1+s/L, 1/L
+
+    return 1-s/L, -1/L
+
+@njit(error_model='numpy')
+def _cpgimp(s, L, lp):
+    """cpGIMP interpolation function and gradient, see `shape.cpGIMP_functions`"""
+
+    if abs(s) >= (L+lp):
+        return 0.0, 0.0
+
+    if s <= (-L+lp):
+        return ((L+lp+s)*(L+lp+s))/(4*L*lp), (L+lp+s)/(2*L*lp)
+
+    if s <= (-lp):
+        return 1 + (s/L), 1/L
+
+    if s <= lp:
+        return 1 - (s*s + lp*lp)/(2*L*lp), -s/(L*lp)
+
+    if s <= (L-lp):
+        return 1 - (s/L), -1/L
+
+    return ((L+lp-s)*(L+lp-s))/(4*L*lp), -(L+lp-s)/(2*L*lp)
+
+@njit(error_model='numpy')
+def _momentum_to_nodes(mass, velocity, N1, N2, conn, offsets, order, n_momentum):
+    """particle momentum to nodes, see `interpolation.momentum_to_nodes`"""
+
+    for e in range(len(conn)):
+        for k in range(offsets[e], offsets[e+1]):
+            p = order[k]
+            n_momentum[conn[e, 0]] += mass[p]*velocity[p]*N1[p]
+            n_momentum[conn[e, 1]] += mass[p]*velocity[p]*N2[p]
+
+@njit(error_model='numpy')
+def _particles_to_nodes(mass, velocity, stress, density, f_ext, N1, N2, dN1, dN2,
+                        conn, offsets, order, n_mass, n_momentum, n_f_int, n_f_ext, forces):
+    """
+    particle mass, momentum and, if `forces`, internal and external forces
+    to nodes in a single pass, see `interpolation.particles_to_nodes`
+    """
+    for e in range(len(conn)):
+
+        n1 = conn[e, 0]
+        n2 = conn[e, 1]
+
+        for k in range(offsets[e], offsets[e+1]):
+
+            p = order[k]
+            mv = mass[p]*velocity[p]
+
+            n_mass[n1] += mass[p]*N1[p]
+            n_mass[n2] += mass[p]*N2[p]
+            n_momentum[n1] += mv*N1[p]
+            n_momentum[n2] += mv*N2[p]
+
+            if forces:
+                n_f_int[n1] -= dN1[p]*stress[p]*mass[p]/density[p]
+                n_f_int[n2] -= dN2[p]*stress[p]*mass[p]/density[p]
+                n_f_ext[n1] += N1[p]*f_ext[p]
+                n_f_ext[n2] += N2[p]*f_ext[p]
+
+@njit(error_model='numpy')
+def _stress_update(velocity_n, dN1, dN2, element, conn, stress, density, dstrain,
+                   kind, param, n_mass, n_momentum, dt):
+    """
+    nodal velocity, particle strain increment, density and stress,
+    see `update.nodal_velocity`, `update.particle_strain_increment`,
+    `update.particle_density` and `update.particle_stress`
+    """
+    for i in range(len(n_mass)):
+        if n_mass[i] != 0:
+            velocity_n[i] = n_momentum[i]/n_mass[i]
+
+    for p in range(len(stress)):
+
+        n1 = conn[element[p], 0]
+        n2 = conn[element[p], 1]
+
+        dstrain[p] = (dN1[p]*velocity_n[n1]+dN2[p]*velocity_n[n2])*dt
+        density[p] = density[p]/(1+dstrain[p])
+
+        if kind[p] == LINEAR_ELASTIC:
+            stress[p] += dstrain[p]*param[p]
+
+        else:
+            stress[p] = param[p]*dstrain[p]/dt
+
+@njit(error_model='numpy')
+def _explicit_step(mass, position, velocity, stress, density, dstrain, f_ext, size,
+                   N1, N2, dN1, dN2, element, kind, param,
+                   xn, n_velocity, n_mass, n_momentum, n_f_int, n_f_ext, n_f_tot, n_f_damp,
+                   conn, le, lengths, offsets, order, outside,
+                   velocity_nodes, velocity_values, force_nodes, force_values,
+                   scheme, shape_type, dt, dt_momentum, alpha):
+    """
+    Compiled time step, see `solver.explicit_solution`.
+    """
+    npart = len(position)
+    nelem = len(conn)
+
+    # update the element containing each particle
+    for p in range(npart):
+
+        x = position[p]
+
+        # particles outside the mesh keep their element and are left out of the elements
+        outside[p] = x < xn[0] or x >= xn[-1]
+
+        if outside[p]:
+            continue
+
+        if le > 0:
+            e = int(np.floor((x-xn[0])/le))
+            e = min(max(e, 0), nelem-1)
+            if x < xn[e]:
+                e -= 1
+            if x >= xn[e+1]:
+                e += 1
+
+        else:
+            e = np.searchsorted(xn, x, side='right')-1
+
+        element[p] = e
+
+    # update the particles in each element
+    offsets[:] = 0
+    for p in range(npart):
+        if not outside[p]:
+            offsets[element[p]+1] += 1
+
+    for e in range(nelem):
+        offsets[e+1] += offsets[e]
+
+    filled = offsets[:-1].copy()
+    last = offsets[-1]
+    for p in range(npart):
+        if outside[p]:
+            order[last] = p
+            last += 1
+        else:
+            order[filled[element[p]]] = p
+            filled[element[p]] += 1
+
+    # update interpolation functions values
+    for p in range(npart):
+
+        n1 = conn[element[p], 0]
+        n2 = conn[element[p], 1]
+        L = lengths[element[p]]
+
+        if shape_type == LINEAR:
+            N1[p], dN1[p] = _linear(position[p]-xn[n1], L)
+            N2[p], dN2[p] = _linear(position[p]-xn[n2], L)
+
+        else:
+            N1[p], dN1[p] = _cpgimp(position[p]-xn[n1], L, size[p]/2)
+            N2[p], dN2[p] = _cpgimp(position[p]-xn[n2], L, size[p]/2)
+
+    # particle mass and momentum to nodes, with the forces when the scheme allows
+    _particles_to_nodes(mass, velocity, stress, density, f_ext, N1, N2, dN1, dN2,
+                        conn, offsets, order, n_mass, n_momentum, n_f_int, n_f_ext,
+                        scheme != USF)
+
+    # impose essential boundary conditions (mv=m*v)
+    for k in range(len(velocity_nodes)):
+        n_momentum[velocity_nodes[k]] = n_mass[velocity_nodes[k]]*velocity_values[k]
+
+    # Update Stress First Scheme
+    if scheme == USF:
+
+        _stress_update(n_velocity, dN1, dN2, element, conn, stress, density, dstrain,
+                       kind, param, n_mass, n_momentum, dt)
+
+        # particle internal and external forces to nodes
+        for e in range(nelem):
+            for k in range(offsets[e], offsets[e+1]):
+                p = order[k]
+                n_f_int[conn[e, 0]] -= dN1[p]*stress[p]*mass[p]/density[p]
+                n_f_int[conn[e, 1]] -= dN2[p]*stress[p]*mass[p]/density[p]
+                n_f_ext[conn[e, 0]] += N1[p]*f_ext[p]
+                n_f_ext[conn[e, 1]] += N2[p]*f_ext[p]
+
+    # impose natural boundary conditions (prescribed nodal forces)
+    for k in range(len(force_nodes)):
+        n_f_ext[force_nodes[k]] += force_values[k]
+
+    # total nodal force and nodal momentum
+    for i in range(len(xn)):
+
+        if alpha > 0 and n_mass[i] != 0:
+
+            nodal_vel = n_momentum[i]/n_mass[i]
+
+            if abs(nodal_vel) != 0:
+                n_f_damp[i] = - alpha * abs(n_f_int[i] + n_f_ext[i]) * (nodal_vel/abs(nodal_vel))
+
+        n_f_tot[i] = n_f_int[i] + n_f_ext[i] + n_f_damp[i]
+
+    for i in velocity_nodes:
+        n_f_tot[i] = 0
+
+    for i in range(len(xn)):
+        n_momentum[i] += n_f_tot[i]*dt_momentum
+
+    # particle velocity and position
+    for p in range(npart):
+
+        n1 = conn[element[p], 0]
+        n2 = conn[element[p], 1]
+
+        velocity[p] += (n_f_tot[n1]/n_mass[n1]*N1[p]+n_f_tot[n2]/n_mass[n2]*N2[p])*dt_momentum
+        position[p] += (n_momentum[n1]/n_mass[n1]*N1[p]+n_momentum[n2]/n_mass[n2]*N2[p])*dt
+
+    # Modified Update Stress Last Scheme
+    if scheme == MUSL:
+
+        n_momentum[:] = 0
+        _momentum_to_nodes(mass, velocity, N1, N2, conn, offsets, order, n_momentum)
+
+        for k in range(len(velocity_nodes)):
+            n_velocity[velocity_nodes[k]] = velocity_values[k]
+            n_momentum[velocity_nodes[k]] = n_mass[velocity_nodes[k]]*velocity_values[k]
+
+    # Modified Update Stress Last or Update Stress Last Scheme
+    if scheme == MUSL or scheme == USL:
+        _stress_update(n_velocity, dN1, dN2, element, conn, stress, density, dstrain,
+                       kind, param, n_mass, n_momentum, dt)
+
+    # reset all nodal values
+    n_velocity[:] = 0
+    n_mass[:] = 0
+    n_momentum[:] = 0
+    n_f_int[:] = 0
+    n_f_ext[:] = 0
+    n_f_tot[:] = 0
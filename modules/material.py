@@ -7,6 +7,8 @@ This module defines classes representing materials
 
 """
 
+from modules import particle
+
 class linear_elastic:
     """ 
     Represents a linear elastic material
@@ -36,6 +38,46 @@ class linear_elastic:
         
         particle.stress+=particle.dstrain*self.E
 
+    def update_stress_batch(self,stress,dstrain,density,dt):
+        
+        """
+        Returns the updated stress of the particles of the material using
+        linear elastic constitutive model
+
+        Arguments
+        ---------
+        stress: array
+            particle stress
+
+        dstrain: array
+            particle strain increment
+
+        density: array
+            particle density
+
+        dt: float
+            time step
+        """
+        
+        return stress+dstrain*particle.batch_values(self.E)
+
+    def critical_time_step(self,density,L):
+
+        """
+        Returns the critical time step of the particles, the time the
+        elastic wave takes to cross the element
+
+        Arguments
+        ---------
+        density: array
+            particle density
+
+        L: float
+            element length
+        """
+
+        return L/(particle.batch_values(self.E)/density)**0.5
+
 class newtonian_fluid:
     """ 
     Represents a Newtonian fluid material
@@ -68,3 +110,42 @@ class newtonian_fluid:
         """
         
         particle.stress=self.mu*particle.dstrain/dt
+
+    def update_stress_batch(self,stress,dstrain,density,dt):
+        
+        """
+        Returns the updated stress of the particles of the material
+
+        Arguments
+        ---------
+        stress: array
+            particle stress
+
+        dstrain: array
+            particle strain increment
+
+        density: array
+            particle density
+
+        dt: float
+            time step
+        """
+        
+        return particle.batch_values(self.mu)*dstrain/dt
+
+    def critical_time_step(self,density,L):
+
+        """
+        Returns the critical time step of the particles, limited by the
+        viscous diffusion across the element
+
+        Arguments
+        ---------
+        density: array
+            particle density
+
+        L: float
+            element length
+        """
+
+        return density*L**2/(2*particle.batch_values(self.mu))
@@ -7,6 +7,9 @@ This module defines classes representing a finite element mesh
 
 """
 
+import numpy as np
+
+from modules import boundary
 from modules import element
 from modules import node
 from modules import particle
@@ -15,16 +18,36 @@ class mesh_1D:
     """
     A class to represent a 1D Eulerian mesh containing elements,
     nodes and particles.
+
+    Arguments
+    ---------
+    L: float
+        mesh length
+
+    nelem: int
+        number of elements
+
+    batch: int
+        number of cases solved together, or None
+
+    x: array
+        increasing nodal positions of a non-uniform mesh, instead of L and nelem
+
+    grading: function
+        function mapping the uniform positions in [0,1] to increasing
+        positions in [0,1], giving a non-uniform mesh of length L with nelem
+        elements
     
     Attributes
     ----------
-    elements : list
-        elements forming the mesh
+    elements : element_set
+        elements forming the mesh, the element objects are created when
+        the elements are indexed
         
-    particles : list
+    particles : particle_set
         particles in mesh
         
-    nodes : list
+    nodes : node_set
         nodes in mesh
         
     nelem : int
@@ -32,48 +55,104 @@ class mesh_1D:
         
     ppelem : int
         particles per element
+
+    connectivity : array
+        node indices (node 1, node 2) of each element
+
+    le : float
+        element length (None in non-uniform meshes)
+
+    element_length : array
+        length of each element
+
+    element_offsets : array
+        offsets of the particles of each element in `element_particles`
+
+    element_particles : array
+        particle indices ordered by element
+
+    particles_outside : array
+        boolean mask of the particles outside the mesh, or None if all particles are inside.
+        These particles keep their last element and are not interpolated to the nodes
+
+    boundary : boundary_conditions
+        nodal boundary conditions, by default the first node is fixed
+
+    active_nodes : slice or array
+        nodes of the elements with particles, as a slice when they are
+        contiguous or as an index array. The nodal values of the other nodes
+        are zero and are not calculated
+
+    segmented_scatter : bool
+        if True the particles ordered by element are interpolated to the
+        nodes summing the segments of particles of each element, set by the
+        solver when the particles are sorted
+
+    particles_sorted : bool
+        True when `segmented_scatter` is set and the particle arrays are
+        ordered by element
+
+    threads : int
+        number of threads of the particle passes interpolating to the nodes
+        and from the nodes, set from the model setup by the solver
+
+    halo : function
+        in subdomains of the parallel solver, function called as
+        `halo(quantities)` after interpolating quantities to the nodes, adding
+        the contributions of the neighbour subdomains, or None
+
+    batch : int
+        number of cases solved together, or None. Material parameters,
+        particle loads and the damping factor may have one value per case
     """
     
-    def __init__(self,L,nelem):
+    def __init__(self,L=None,nelem=None,batch=None,x=None,grading=None):
+        
+        # nodal positions of non-uniform meshes
+        if x is not None:
+            x=np.asarray(x,dtype=float)
+            nelem=len(x)-1
+        
+        elif grading is not None:
+            x=L*np.asarray(grading(np.linspace(0,1,nelem+1)),dtype=float)
         
-        self.elements=[]    # mesh elements
-        self.particles=[]   # particles in mesh
-        self.nodes=[]       # nodes in mesh
+        if x is not None and (x.ndim!=1 or nelem<1 or np.any(np.diff(x)<=0)):
+            raise ValueError("the nodal positions must be increasing")
+        
+        self.elements=element.element_set(self) # mesh elements, created when indexed
+        self.particles=particle.particle_set(batch) # particles in mesh
+        self.nodes=node.node_set(nelem+1,batch) # nodes in mesh
+        self.batch=batch    # cases solved together
         self.nelem=nelem    # elements in mesh
         self.ppelem=0       # particles per element
+        self.connectivity=np.column_stack((np.arange(nelem),np.arange(1,nelem+1))) # element nodes
+        self.le=L/nelem if x is None else None # element length of uniform meshes
+        self.element_offsets=np.zeros(nelem+1,dtype=int) # particles per element offsets
+        self.element_particles=np.zeros(0,dtype=int) # particles ordered by element
+        self.particles_outside=None # particles outside the mesh
+        self.active_nodes=slice(None) # nodes of the elements with particles
+        self.boundary=boundary.boundary_conditions(batch) # nodal boundary conditions
+        self.segmented_scatter=False # interpolation to the nodes by element segments
+        self.particles_sorted=False # particle arrays ordered by element
+        self.threads=1 # threads of the particle passes
+        self.halo=None # exchange of the subdomain boundary nodes
         
-        for i in range(nelem):
-            
-            if i==0: 
-                
-                ielem = element.bar_1D()
-                ielem.id=i 
-                
-                ielem.n1=node.node_1D()
-                ielem.n1.id=len(self.nodes)
-                self.nodes.append(ielem.n1)
-                
-                ielem.n2=node.node_1D()
-                ielem.n2.id=len(self.nodes)
-                self.nodes.append(ielem.n2)
-                
-            else:
-                ielem = element.bar_1D()
-                ielem.id=i
-                ielem.n1=self.elements[i-1].n2
-                
-                ielem.n2=node.node_1D()
-                ielem.n2.id=len(self.nodes)
-                self.nodes.append(ielem.n2)
-            
-            le = L/nelem
-            ielem.L=le
-            ielem.n1.x=i*le
-            ielem.n2.x=ielem.n1.x+le
-            
-            self.elements.append(ielem)
+        # nodal positions and element lengths
+        if x is None:
+            self.nodes.x[:-1]=np.arange(nelem)*self.le
+            self.nodes.x[-1]=self.nodes.x[-2]+self.le
+            self.element_length=np.full(nelem,self.le)
+        else:
+            self.nodes.x[:]=x
+            self.element_length=np.diff(x)
+        
+        # elements referenced by the particles
+        self.particles.elements=self.elements
+
+        # fixed first node
+        self.boundary.fix(0)
             
-    def put_particles_in_all_mesh_elements(self,ppelem,material):
+    def put_particles_in_all_mesh_elements(self,ppelem,material,density=None,material_id=0):
         """
         Distributes particles in elements mesh
         
@@ -82,47 +161,18 @@ class mesh_1D:
         ppelem: int
             number of particles per element
 
-        material: material
-            a material object
+        material: material or list
+            a material object, or a list of materials indexed by `material_id`
 
-        """
-        self.ppelem=ppelem
-            
-        for ie in range(self.nelem):
-            
-            ie = self.elements[ie]
-            le = ie.L
-         
-            for i in range(ppelem):
-                
-                # particle mass
-                pmass = le*material.density/ppelem
-                
-                # particle position
-                if(len(ie.particles)==0):
-                    xp=ie.n1.x+le/(2*ppelem)
-                    
-                elif(len(ie.particles)==(ppelem-1)):
-                    xp=ie.n2.x-le/(2*ppelem)   
-                
-                else:
-                    xp=ie.n1.x+le/(2*ppelem)+len(ie.particles)*(le/ppelem)
-                    
-                # create particle
-                ip = particle.material_point(pmass,material,xp)
-                ip.id=len(self.particles)
-                ip.size = ie.L/ppelem
-                
-                # set the element in the particle
-                ip.element=ie
+        density: float, array or function
+            particle density, see `put_particles_in_elements`
 
-                # append in elements
-                ie.particles.append(ip)                
-                                
-                # append in mesh
-                self.particles.append(ip)
+        material_id: int, array or function
+            index of the particle material, see `put_particles_in_elements`
+        """
+        self.put_particles_in_elements(ppelem,material,np.arange(self.nelem),density,material_id)
         
-    def put_particles_in_mesh_by_elements_id(self,ppelem,material,elem_i,elem_f):
+    def put_particles_in_mesh_by_elements_id(self,ppelem,material,elem_i,elem_f,density=None,material_id=0):
         """
         Distributes particles in elements mesh from xi to xf
         
@@ -131,8 +181,8 @@ class mesh_1D:
         ppelem: int
             number of particles per element
 
-        material: material
-            a material object
+        material: material or list
+            a material object, or a list of materials indexed by `material_id`
 
         elem_i: int
             initial element id to distribute particles
@@ -140,45 +190,252 @@ class mesh_1D:
         elem_f: int
             final element id to distribute particles
 
+        density: float, array or function
+            particle density, see `put_particles_in_elements`
+
+        material_id: int, array or function
+            index of the particle material, see `put_particles_in_elements`
+        """
+        elements=np.arange(max(elem_i,0),min(elem_f,self.nelem-1)+1)
+        
+        self.put_particles_in_elements(ppelem,material,elements,density,material_id)
+
+    def put_particles_in_elements(self,ppelem,material,elements,density=None,material_id=0):
+        """
+        Distributes particles in elements, computing the positions, masses
+        and sizes of all particles at once
+        
+        The particles are equally spaced in the element, after the particles
+        already in the element. The density and the material index can vary
+        in space, given as a value per element or as a function of the
+        particle positions.
+        
+        Arguments
+        ---------
+        ppelem: int
+            number of particles per element
+
+        material: material or list
+            a material object, or a list of materials indexed by `material_id`
+
+        elements: array
+            index of the elements to distribute particles
+
+        density: float, array or function
+            particle density: a value, one value per element in `elements` or
+            a function of the particle positions. By default the density of
+            the particle material
+
+        material_id: int, array or function
+            index of the particle material in the `material` list: a value,
+            one value per element in `elements` or a function of the particle
+            positions
         """
         self.ppelem=ppelem
+        elements=np.asarray(elements,dtype=int)
+        
+        # particles already in each element
+        pcount=self.particles_per_element()[0][elements]
+        
+        # first and last particle positions and particle spacing in each element
+        le=self.element_length[elements]
+        first=self.nodes.x[self.connectivity[elements,0]]+le/(2*ppelem)
+        last=self.nodes.x[self.connectivity[elements,1]]-le/(2*ppelem)
+        step=le/ppelem
+        
+        # particle position, for each particle index in the element
+        xp=np.empty((len(elements),ppelem))
+        
+        for i in range(ppelem):
+            nparticles=pcount+i
+            
+            xi=first+nparticles*step
+            np.copyto(xi,last,where=nparticles==(ppelem-1))
+            np.copyto(xi,first,where=nparticles==0)
+            xp[:,i]=xi
+        
+        xp=xp.ravel()
+        le=np.repeat(le,ppelem)
+        pelem=np.repeat(elements,ppelem)
+        
+        # particle material and density
+        materials=material if isinstance(material,(list,tuple)) else [material]
+        pmaterial=np.asarray(self.seeding_values(material_id,xp,ppelem),dtype=int)
+        
+        if density is None:
+            pdensity=np.array([np.broadcast_to(imat.density,self.particles.shape(1)[:-1]) for imat in materials],dtype=float)
+            pdensity=np.moveaxis(pdensity,0,-1)[...,np.atleast_1d(pmaterial)]
+        else:
+            pdensity=self.seeding_values(density,xp,ppelem)
+        
+        # create particles in mesh (with masses of each batch case in rows)
+        self.add_particles(le*pdensity/ppelem,materials,xp,le/ppelem,pelem,pdensity,pmaterial)
 
-        for ie in range(self.nelem):
+    def seeding_values(self,value,x,ppelem):
+        """
+        Returns the value of a seeding parameter in each particle
+        
+        Arguments
+        ---------
+        value: float, array or function
+            a value, one value per seeded element or a function of the particle positions
+
+        x: array
+            particle positions
+
+        ppelem: int
+            number of particles per element
+        """
+        if callable(value):
+            return value(x)
+        
+        value=np.asarray(value)
+        
+        if value.ndim==0:
+            return value
+        
+        return np.repeat(value,ppelem)
+
+    def add_particles(self,mass,material,x,size,elements,density=None,material_id=0):
+        """
+        Creates particles in the particle set and updates the particles in each element
+        
+        Arguments
+        ---------
+        mass: float or array
+            particle mass
+
+        material: material or list
+            a material object, or a list of materials indexed by `material_id`
+
+        x: array
+            particle position
+
+        size: float or array
+            particle size
+
+        elements: array
+            id of the element containing each particle
+
+        density: float or array
+            particle density, by default the density of the particle material
+
+        material_id: int or array
+            index of the particle material in the `material` list
+        """
+        self.particles.add(mass,material,x,size,elements,density,material_id)
+        
+        self.set_particles_in_elements()
+
+    def locate(self,x):
+        """
+        Returns the index of the element containing each position,
+        or -1 for positions outside the mesh.
+
+        In uniform meshes the element index is obtained directly from the
+        cell spacing and then verified against the nodal positions. In
+        non-uniform meshes (`le` is None) it is found by a binary search
+        over the nodal positions. In both cases a position at a node belongs
+        to the element at its right.
+
+        Arguments
+        ---------
+        x: array
+            positions to locate
+        """
+        xn=self.nodes.x
+        
+        if self.le is not None:
+            
+            # cell index from the cell spacing
+            e=np.floor((x-xn[0])/self.le).astype(int)
+            np.clip(e,0,self.nelem-1,out=e)
             
-            ie = self.elements[ie]
-            le = ie.L
+            # correct the rounding against the nodal positions
+            e-=x<xn[e]
+            e+=x>=xn[e+1]
+        
+        else:
             
-            # verify if the element is allow to get particles
-            if ie.id<elem_i or ie.id>elem_f:
-                continue 
+            # binary search over the nodal positions
+            e=np.searchsorted(xn,x,side='right')-1
+        
+        # positions outside the mesh
+        e[(x<xn[0])|(x>=xn[-1])]=-1
+        
+        return e
 
-            for i in range(ppelem):
-                
-                # particle mass
-                pmass = le*material.density/ppelem
-                
-                # particle position
-                if(len(ie.particles)==0):
-                    xp=ie.n1.x+le/(2*ppelem)
-                    
-                elif(len(ie.particles)==(ppelem-1)):
-                    xp=ie.n2.x-le/(2*ppelem)   
-                
-                else:
-                    xp=ie.n1.x+le/(2*ppelem)+len(ie.particles)*(le/ppelem)
-                    
-                # create particle
-                ip = particle.material_point(pmass,material,xp)
-                ip.id=len(self.particles)
-                
-                # set the element in the particle
-                ip.element=ie
+    def particles_per_element(self):
+        """
+        Returns the number of particles in each element, one row per batch case
+        """
+        elem=np.atleast_2d(self.element_keys())
+        ncases=len(elem)
+        
+        # element index of each batch case in the counts (particles outside the mesh at the end)
+        shift=np.arange(ncases)[:,None]*(self.nelem+1)
+        count=np.bincount((elem+shift).ravel(),minlength=ncases*(self.nelem+1))
+        
+        return count.reshape(ncases,self.nelem+1)[:,:-1]
 
-                # append in elements
-                ie.particles.append(ip)                
-                                
-                # append in mesh
-                self.particles.append(ip)
+    def element_keys(self):
+        """
+        Returns the element index of the particles, with `nelem` for the particles outside the mesh
+        """
+        if self.particles_outside is None:
+            return self.particles.element
+        
+        return np.where(self.particles_outside,self.nelem,self.particles.element)
+
+    def set_particles_in_elements(self):
+        """
+        Updates the particles in each element from the element index of the particles.
+        
+        The particles of the element `i` are
+        `element_particles[element_offsets[i]:element_offsets[i+1]]`, 
+        in increasing particle index order. The particles outside the mesh
+        are placed after `element_offsets[-1]`. In batched meshes these arrays
+        have one row per batch case.
+        """
+        elem=self.element_keys()
+        
+        # particles per element
+        count=self.particles_per_element()
+        offsets=np.concatenate((np.zeros((len(count),1),dtype=int),np.cumsum(count,axis=1)),axis=1)
+        
+        self.element_offsets=offsets.reshape(elem.shape[:-1]+(self.nelem+1,))
+        self.element_particles=np.argsort(elem,axis=-1,kind='stable')
+
+        # particles ordered by element, interpolated to the nodes by segments
+        self.particles_sorted=self.segmented_scatter and self.batch is None and bool(np.all(elem[1:]>=elem[:-1]))
+
+        # nodes of the elements with particles in any case (the nodes i and i+1 of the element i)
+        occupied=np.any(count>0,axis=0)
+        active=np.zeros(len(self.nodes),dtype=bool)
+        active[:-1]=occupied
+        active[1:]|=occupied
+        nactive=np.count_nonzero(active)
+        first=np.argmax(active)
+        
+        if nactive==0:
+            self.active_nodes=slice(0,0)
+        elif active[first:first+nactive].all():
+            self.active_nodes=slice(first,first+nactive)
+        else:
+            self.active_nodes=np.flatnonzero(active)
+
+    def particles_in_element(self,i):
+        """
+        Returns the particles in an element (of the first case in batched meshes)
+
+        Arguments
+        ---------
+        i: int
+            element index
+        """
+        offsets=np.atleast_2d(self.element_offsets)[0]
+        ids=np.atleast_2d(self.element_particles)[0][offsets[i]:offsets[i+1]]
+        return [self.particles[ip] for ip in self.particles.particle_id(ids)]
 
     def print_mesh(self,print_labels=True):
         """
@@ -202,7 +459,7 @@ class mesh_1D:
                 plt.annotate("n%d"%ie.n1.id, xy=(ie.n1.x,dy),fontsize=13)
                 plt.annotate("n%d"%ie.n2.id, xy=(ie.n2.x,dy),fontsize=13)
             
-            for ip in ie.particles:
+            for ip in self.particles_in_element(ie.id):
                 plt.plot(ip.position,0,'ob')
                 if(print_labels):
                     plt.annotate("p%d"%ip.id, xy=(ip.position,dy),fontsize=13)
@@ -233,7 +490,7 @@ class mesh_1D:
             
             print('particles')
             print('id\txp')
-            for ip in ie.particles:    
+            for ip in self.particles_in_element(ie.id):
                 print('%d\t%.2f'%(ip.id,ip.position))
                 
             print(20*'--')
\ No newline at end of file
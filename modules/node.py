@@ -7,6 +7,10 @@ This module defines classes representing a node in a finite element mesh
 
 """
 
+import numpy as np
+
+from modules import particle
+
 class node_1D:
     """
     Represent a 1D node
@@ -40,6 +44,8 @@ class node_1D:
     f_damp  : float
         damping force
     """
+    __slots__ = ('id', 'x', 'velocity', 'mass', 'momentum', 'f_int', 'f_ext', 'f_tot', 'f_damp')
+
     def __init__(self):
         
         self.id = 0
@@ -50,4 +56,102 @@ class node_1D:
         self.f_int = 0
         self.f_ext = 0
         self.f_tot = 0
-        self.f_damp = 0
\ No newline at end of file
+        self.f_damp = 0
+
+class node_set:
+    """
+    Represent the nodes of a mesh stored as contiguous arrays
+    (structure of arrays), one entry per node.
+    
+    Attributes
+    ----------
+    x : array
+        nodal position
+
+    velocity : array
+        nodal velocity
+
+    mass : array
+        nodal mass
+
+    momentum : array
+        nodal momentum (mass*velocity)
+
+    f_int : array
+        nodal internal force
+
+    f_ext : array
+        nodal external force
+
+    f_tot : array
+        total force
+
+    f_damp : array
+        damping force
+
+    batch : int
+        number of batch cases, or None. In batched sets the nodal fields,
+        except the position, have shape (batch, number of nodes)
+    """
+
+    # floating point nodal fields
+    fields = ('x','velocity','mass','momentum','f_int','f_ext','f_tot','f_damp')
+
+    def __init__(self,nnodes,batch=None):
+
+        self.batch = batch
+        shape = (nnodes,) if batch is None else (batch, nnodes)
+
+        for name in self.fields:
+            setattr(self, name, np.zeros(shape))
+
+        # nodal positions are shared by the batch cases
+        self.x = np.zeros(nnodes)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+
+        index = range(len(self))[i]
+
+        if isinstance(index, range):
+            return [node_view(self, k) for k in index]
+
+        return node_view(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield node_view(self, i)
+
+class node_view:
+    """
+    Represent a node stored in a node set.
+
+    It exposes the same attributes as `node_1D`, reading and writing
+    the arrays of the node set.
+
+    Attributes
+    ----------
+    id : int
+        node identification (index in the node set)
+    """
+    __slots__ = ('_set', '_index')
+
+    def __init__(self, nset, index):
+
+        self._set = nset
+        self._index = index
+
+    x = particle._array_field('x')
+    velocity = particle._array_field('velocity')
+    mass = particle._array_field('mass')
+    momentum = particle._array_field('momentum')
+    f_int = particle._array_field('f_int')
+    f_ext = particle._array_field('f_ext')
+    f_tot = particle._array_field('f_tot')
+    f_damp = particle._array_field('f_damp')
+
+    @property
+    def id(self):
+        return self._index
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module solves the motion equation explicitly in time splitting the mesh
+in subdomains solved in parallel worker processes
+
+The elements are split in contiguous subdomains with a similar number of
+particles, one per worker. The particle arrays are kept in shared memory,
+ordered by element, so the particles of each subdomain are a contiguous range
+of the arrays. Each worker has the nodes of its subdomain, and the nodes at
+the boundary between two subdomains are repeated in both workers: after each
+interpolation to the nodes the workers exchange their contributions to these
+nodes (halo exchange). At the beginning of each step the particles are
+located, and the ranges of particles of the subdomains are updated with the
+particles that crossed to a neighbour subdomain (particle migration).
+
+The results match the serial solver except for the round-off of the sums in
+the boundary nodes.
+
+"""
+
+import multiprocessing
+import os
+import threading
+import types
+import warnings
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from modules import boundary
+from modules import mesh
+from modules import node
+from modules import particle
+from modules import recorder
+from modules import solver
+
+class shared_arrays:
+    """
+    Represent numpy arrays stored in shared memory blocks
+
+    Attributes
+    ----------
+    arrays : dict
+        array of each name
+
+    blocks : dict
+        shared memory block of each name
+    """
+    def __init__(self):
+
+        self.arrays = {}
+        self.blocks = {}
+
+    def create(self, name, values):
+        """
+        Creates a shared array with a copy of the values
+
+        Arguments
+        ---------
+        name: string
+            array name
+
+        values: array
+            initial values
+        """
+        values = np.asarray(values)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+
+        self.blocks[name] = block
+        self.arrays[name] = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+        self.arrays[name][...] = values
+
+        return self.arrays[name]
+
+    def descriptors(self):
+        """
+        Returns the block name, shape and type of each array, to attach the arrays in other processes
+        """
+        return {name: (self.blocks[name].name, array.shape, array.dtype.str) for name, array in self.arrays.items()}
+
+    def attach(self, descriptors):
+        """
+        Attaches the arrays created in other process
+
+        Arguments
+        ---------
+        descriptors: dict
+            block name, shape and type of each array
+        """
+        for name, (block_name, shape, dtype) in descriptors.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            self.blocks[name] = block
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def close(self, unlink=False):
+        """
+        Releases the shared memory blocks
+
+        Arguments
+        ---------
+        unlink: bool
+            if True the blocks are destroyed (in the process that created them)
+        """
+        self.arrays = {}
+
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+
+        self.blocks = {}
+
+def subdomains(msh, workers):
+    """
+    Returns the first element of each subdomain and the end of the last one,
+    splitting the elements in contiguous subdomains with a similar number
+    of particles
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+
+    workers: int
+        number of subdomains
+    """
+    count = np.cumsum(np.bincount(msh.particles.element, minlength=msh.nelem))
+    target = np.arange(1, workers)*count[-1]/workers
+
+    first = np.concatenate(([0], np.searchsorted(count, target, side='right'), [msh.nelem]))
+
+    # at least one element per subdomain
+    for k in range(1, workers):
+        first[k] = min(max(first[k], first[k-1]+1), msh.nelem-(workers-k))
+
+    return first
+
+def subdomain_mesh(msh, first, last):
+    """
+    Returns the mesh of the subdomain formed by the elements from first to last-1
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+
+    first: int
+        first element of the subdomain
+
+    last: int
+        end of the elements of the subdomain
+    """
+    sub = mesh.mesh_1D(x=msh.nodes.x[first:last+1])
+
+    # same nodal positions and element length of the complete mesh
+    sub.nodes.x[:] = msh.nodes.x[first:last+1]
+    sub.le = msh.le
+    sub.element_length = msh.element_length[first:last].copy()
+
+    # boundary conditions of the subdomain nodes
+    bc = msh.boundary
+    sub.boundary = boundary.boundary_conditions()
+
+    inside = (bc.velocity_nodes >= first) & (bc.velocity_nodes <= last)
+    sub.boundary.prescribe_velocity(bc.velocity_nodes[inside]-first, bc.velocity_values[inside])
+
+    inside = (bc.force_nodes >= first) & (bc.force_nodes <= last)
+    sub.boundary.prescribe_force(bc.force_nodes[inside]-first, bc.force_values[inside])
+
+    return sub
+
+def worker(k, workers, msh, msetup, descriptors, first, barrier, halo_barrier):
+    """
+    Solves the time steps of a subdomain, see `explicit_solution`
+
+    Arguments
+    ---------
+    k: int
+        subdomain index
+
+    workers: int
+        number of subdomains
+
+    msh: mesh
+        the complete mesh
+
+    msetup : model_setup
+        a model_setup object containing the model options
+
+    descriptors: dict
+        shared arrays descriptors
+
+    first: array
+        first element of each subdomain
+
+    barrier: Barrier
+        synchronization of the workers and the main process
+
+    halo_barrier: Barrier
+        synchronization of the workers in the halo exchange
+    """
+    shared = shared_arrays()
+    shared.attach(descriptors)
+    a = shared.arrays
+
+    try:
+        e0, e1 = first[k], first[k+1]
+        sub = subdomain_mesh(msh, e0, e1)
+        n = sub.nodes
+
+        # boundary nodes of the subdomain in elements with particles
+        ends = np.zeros(2, dtype=bool)
+
+        def halo(quantities):
+
+            # contributions of the subdomain to its boundary nodes (the values of
+            # nodes without particles of the subdomain are from the last exchange)
+            for j, q in enumerate(quantities):
+                a['halo'][k, :, j] = np.where(ends, getattr(n, q)[[0, -1]], 0)
+
+            halo_barrier.wait()
+
+            # sum of the contributions, always from the left to the right subdomain
+            for j, q in enumerate(quantities):
+                values = getattr(n, q)
+                if k > 0:
+                    values[0] = a['halo'][k-1, 1, j]+a['halo'][k, 0, j]
+                if k < workers-1:
+                    values[-1] = a['halo'][k, 1, j]+a['halo'][k+1, 0, j]
+
+            halo_barrier.wait()
+
+        sub.halo = halo
+
+        # time step phases, the particles are located before
+        pipeline = [phase for phase in solver.step_pipeline(msetup) if phase[0] != 'particle list']
+
+        while True:
+
+            # wait the time step or the end of the solution
+            barrier.wait()
+
+            if a['control'][0]:
+                for name in node.node_set.fields:
+                    a['node_'+name][e0:e1+1] = getattr(n, name)
+                break
+
+            dt_momentum = a['control'][1]
+
+            # locate the particles of the subdomain in the complete mesh
+            p0, p1 = a['ranges'][k], a['ranges'][k+1]
+            elem = msh.locate(a['position'][p0:p1])
+            out = elem < 0
+
+            a['element'][p0:p1] = np.where(out, a['element'][p0:p1], elem)
+            a['outside'][p0:p1] = out
+            a['sorted'][k] = np.all(np.diff(a['element'][p0:p1]) >= 0)
+
+            # wait the particle migration
+            barrier.wait()
+            barrier.wait()
+
+            # particles of the subdomain
+            p0, p1 = a['ranges'][k], a['ranges'][k+1]
+            pset = particle.particle_set()
+
+            for name in pset.fields:
+                setattr(pset, name, a[name][p0:p1])
+
+            pset.element = a['element'][p0:p1]-e0
+            pset.material_id = a['material_id'][p0:p1]
+            pset.materials = msh.particles.materials
+            pset.elements = sub.elements
+
+            sub.particles = pset
+            out = a['outside'][p0:p1]
+            sub.particles_outside = out if np.any(out) else None
+            sub.set_particles_in_elements()
+
+            active = np.zeros(len(n), dtype=bool)
+            active[sub.active_nodes] = True
+            ends[:] = active[[0, -1]]
+
+            for name, phase in pipeline:
+                phase(sub, msetup, dt_momentum)
+
+            # particle fields replaced by new arrays in the phases
+            for name in pset.fields:
+                if not np.shares_memory(getattr(pset, name), a[name]):
+                    a[name][p0:p1] = getattr(pset, name)
+
+            # reset the boundary nodes, that may have contributions only of the neighbour subdomain
+            for name in ('velocity', 'mass', 'momentum', 'f_int', 'f_ext', 'f_tot'):
+                getattr(n, name)[[0, -1]] = 0
+
+            # end of the time step
+            barrier.wait()
+
+    except BaseException:
+        barrier.abort()
+        halo_barrier.abort()
+        raise
+
+    finally:
+        shared.close()
+
+def explicit_solution(msh, msetup, workers=None):
+    """
+    Calculates the explicit solution of the motion equation using the MPM,
+    solving the subdomains of the mesh in parallel worker processes
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+
+    msetup : model_setup
+        a model_setup object containing the model options
+
+    workers: int
+        number of worker processes, by default the number of processors
+
+    Returns
+    -------
+    solution field in time
+    """
+    if msh.batch is not None or msetup.adaptive_dt or msetup.checkpoint_file is not None:
+        raise ValueError("the parallel solver does not solve batched meshes, adaptive time steps or checkpoints")
+
+    if msetup.backend not in ("numpy", "numba"):
+        raise ValueError("unknown backend '%s', can be 'numpy' or 'numba'" % msetup.backend)
+
+    if msetup.backend == "numba":
+        warnings.warn("the parallel solver does not compile the time steps, using the numpy backend")
+
+    # phases of the time step, checking the model options
+    solver.step_pipeline(msetup)
+
+    # precision of the particle fields
+    p = msh.particles
+    p.set_precision(msetup.precision)
+
+    workers = min(workers or os.cpu_count(), msh.nelem)
+    first = subdomains(msh, workers)
+
+    npart = len(p)
+
+    # particles ordered by element, and position of each particle in the shared arrays
+    order = np.argsort(p.element, kind='stable')
+    slot = np.empty(npart, dtype=int)
+    slot[order] = np.arange(npart)
+
+    shared = shared_arrays()
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    processes = []
+
+    try:
+        for name in p.fields:
+            shared.create(name, getattr(p, name)[order])
+
+        shared.create('element', p.element[order])
+        shared.create('material_id', p.material_id[order])
+        shared.create('outside', np.zeros(npart, dtype=bool))
+
+        for name in node.node_set.fields:
+            shared.create('node_'+name, getattr(msh.nodes, name))
+
+        a = shared.arrays
+        shared.create('ranges', np.searchsorted(a['element'], first))
+        a['ranges'][-1] = npart
+        shared.create('sorted', np.ones(workers, dtype=bool))
+        shared.create('halo', np.zeros((workers, 2, 4)))
+        shared.create('control', np.zeros(2))
+
+        # particles of the shared arrays for recording
+        pset = particle.particle_set()
+        for name in p.fields:
+            setattr(pset, name, a[name])
+        view = types.SimpleNamespace(particles=pset)
+
+        rec = msetup.recorder
+        if rec is None:
+            rec = recorder.recorder(particles=[msetup.solution_particle], fields=[msetup.solution_field])
+        rec.start(msh, msetup)
+        recorded_ids = rec.particles
+        recorded = p.storage_index(np.arange(npart)[recorded_ids])
+        rec.particles = slot[recorded]
+
+        barrier = context.Barrier(workers+1)
+        halo_barrier = context.Barrier(workers)
+
+        for k in range(workers):
+            process = context.Process(target=worker, args=(k, workers, msh, msetup, shared.descriptors(), first, barrier, halo_barrier))
+            process.start()
+            processes.append(process)
+
+        timer = msetup.timer
+
+        # loop counter and current loop time
+        loop_counter = 1
+        it = 0
+
+        # main simulation loop
+        while it <= msetup.time:
+
+            if timer is not None:
+                timer.start_step(npart)
+
+            # time step to integrate the nodal momentum (half step in the first loop)
+            a['control'][1] = msetup.dt/2.0 if loop_counter == 1 else msetup.dt
+
+            # the workers locate their particles
+            barrier.wait()
+            barrier.wait()
+
+            # particles that overtook particles of other elements are ordered again
+            ranges = a['ranges']
+            in_order = np.all(a['sorted']) and all(a['element'][r-1] <= a['element'][r] for r in ranges[1:-1] if 0 < r < npart)
+
+            if not in_order:
+                reorder = np.argsort(a['element'], kind='stable')
+                for name in list(p.fields)+['element', 'material_id', 'outside']:
+                    a[name][:] = a[name][reorder]
+                order = order[reorder]
+                slot[order] = np.arange(npart)
+                rec.particles = slot[recorded]
+
+            # particles migrated to other subdomains
+            ranges[1:-1] = np.searchsorted(a['element'], first[1:-1])
+            barrier.wait()
+
+            # the workers solve the time step
+            barrier.wait()
+
+            if timer is not None:
+                timer.mark('parallel step')
+
+            rec.record(view, it)
+
+            if timer is not None:
+                timer.mark('record')
+
+            loop_counter += 1
+            it += msetup.dt
+
+        # stop the workers, that copy their nodes to the shared arrays
+        a['control'][0] = 1
+        barrier.wait()
+
+        for process in processes:
+            process.join()
+
+        # particles and nodes in the original order
+        for name in p.fields:
+            getattr(p, name)[...] = a[name][slot]
+
+        p.element[...] = a['element'][slot]
+        outside = a['outside'][slot]
+        msh.particles_outside = outside if np.any(outside) else None
+        msh.set_particles_in_elements()
+
+        for name in node.node_set.fields:
+            getattr(msh.nodes, name)[...] = a['node_'+name]
+
+        rec.particles = recorded_ids
+
+    except threading.BrokenBarrierError:
+        raise RuntimeError("a worker process of the parallel solver failed")
+
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        shared.close(unlink=True)
+
+    # solution in time of the first recorded field and particle
+    rec.finish()
+    msetup.solution_array = [rec.time, rec[rec.fields[0]][..., 0]]
+
+    return np.transpose(msetup.solution_array[1])
@@ -7,6 +7,8 @@ This module defines classes representing a material point (or particle)
 
 """
 
+import numpy as np
+
 class material_point:
     """
     Represent a material point.
@@ -63,6 +65,10 @@ class material_point:
         particle size
 
     """
+    __slots__ = ('mass', 'position', 'material', 'density', 'velocity', 'stress',
+                 'dstrain', 'momentum', 'id', 'f_ext', 'element', 'N1', 'N2',
+                 'dN1', 'dN2', 'size')
+
     def __init__(self, mass, material,x):
         
         self.mass = mass
@@ -80,5 +86,406 @@ class material_point:
         self.N1 = 0           
         self.N2 = 0           
         self.dN1 = 0          
-        self.dN1 = 0
-        self.size = 0          
\ No newline at end of file
+        self.dN2 = 0
+        self.size = 0          
+
+def batch_values(value):
+    """
+    Returns a parameter broadcastable against particle or node arrays: scalars
+    are unchanged and arrays with one value per batch case become columns
+
+    Arguments
+    ---------
+    value : float or array
+        parameter value
+    """
+    if np.ndim(value) == 0:
+        return value
+
+    return np.asarray(value, dtype=float)[:, None]
+
+def _storage_index(view):
+    """
+    Returns the position of the entry of a view in the arrays of its set,
+    that differs from the view index in particle sets sorted by element
+
+    Arguments
+    ---------
+    view : material_point_view or node_view
+        a view of a particle or node set
+    """
+    slot = getattr(view._set, 'slot', None)
+
+    return view._index if slot is None else slot[view._index]
+
+def _array_field(name):
+    """
+    Returns a property reading and writing one entry of an array
+    of a particle set (or node set).
+
+    In batched sets the entry holds one value per batch case.
+
+    Arguments
+    ---------
+    name : string
+        name of the array in the set
+    """
+    def getter(self):
+        values = getattr(self._set, name)
+        
+        if values.ndim == 1:
+            return values[_storage_index(self)]
+        
+        return values[:, _storage_index(self)].copy()
+
+    def setter(self, value):
+        getattr(self._set, name)[..., _storage_index(self)] = value
+
+    return property(getter, setter)
+
+class particle_set:
+    """
+    Represent the material points of a mesh stored as contiguous arrays
+    (structure of arrays), one entry per particle.
+
+    Attributes
+    ----------
+
+    mass : array
+        particle mass
+
+    position : array
+        particle position
+
+    velocity : array
+        particle velocity
+
+    stress : array
+        particle stress
+
+    density : array
+        particle density
+
+    dstrain : array
+        particle strain increment
+
+    f_ext : array
+        external force in particle
+
+    size : array
+        particle size
+
+    N1, N2 : array
+        values of the interpolation functions of nodes 1 and 2
+
+    dN1, dN2 : array
+        values of the interpolation function gradients of nodes 1 and 2
+
+    element : array of int
+        index of the element containing the particle
+
+    material_id : array of int
+        index of the particle material in `materials`
+
+    materials : list
+        materials used by the particles
+
+    elements : list
+        elements of the mesh, referenced by the element index
+
+    ids : array of int
+        particle identification of each entry of the arrays, or None if
+        the set was never sorted (the identification is the array index)
+
+    slot : array of int
+        index in the arrays of each particle identification, or None if the
+        set was never sorted. The particles are indexed (`pset[i]`,
+        recorded particles) by their identification
+
+    batch : int
+        number of batch cases, or None. In batched sets the floating point
+        fields and the element index have shape (batch, number of particles)
+    """
+
+    # floating point particle fields
+    fields = ('mass','position','velocity','stress','density','dstrain',
+              'f_ext','size','N1','N2','dN1','dN2')
+
+    # fields kept in double precision (the positions accumulate small displacements)
+    float64_fields = ('position',)
+
+    def __init__(self, batch=None):
+
+        self.batch = batch
+        shape = self.shape(0)
+
+        for name in self.fields:
+            setattr(self, name, np.zeros(shape))
+
+        self.element = np.zeros(shape, dtype=int)
+        self.material_id = np.zeros(0, dtype=int)
+        self.materials = []
+        self._groups = None
+        self.ids = None
+        self.slot = None
+        self.elements = []
+
+    def __len__(self):
+        return self.mass.shape[-1]
+
+    def shape(self, n):
+        """
+        Returns the shape of the particle arrays
+
+        Arguments
+        ---------
+        n: int
+            number of particles
+        """
+        return (n,) if self.batch is None else (self.batch, n)
+
+    def __getitem__(self, i):
+
+        index = range(len(self))[i]
+
+        if isinstance(index, range):
+            return [material_point_view(self, k) for k in index]
+
+        return material_point_view(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield material_point_view(self, i)
+
+    def material_index(self, material):
+        """
+        Returns the index of a material in the particle set, registering it if needed
+
+        Arguments
+        ---------
+        material: material
+            a material object
+        """
+        for i, imat in enumerate(self.materials):
+            if imat is material:
+                return i
+
+        self.materials.append(material)
+        return len(self.materials)-1
+
+    def storage_index(self, ids):
+        """
+        Returns the index in the arrays of particles
+
+        Arguments
+        ---------
+        ids: int or array
+            particle identification
+        """
+        return ids if self.slot is None else self.slot[ids]
+
+    def particle_id(self, index):
+        """
+        Returns the identification of the particles in an index of the arrays
+
+        Arguments
+        ---------
+        index: int or array
+            index in the arrays
+        """
+        return index if self.ids is None else self.ids[index]
+
+    def set_ids(self, ids):
+        """
+        Sets the particle identification of each entry of the arrays
+
+        Arguments
+        ---------
+        ids: array
+            particle identification, a permutation of the array indices
+        """
+        self.ids = np.asarray(ids, dtype=int)
+        self.slot = np.empty_like(self.ids)
+        self.slot[self.ids] = np.arange(len(self.ids))
+
+    def permute(self, order):
+        """
+        Reorders the particle arrays, keeping the particle identifications
+
+        Arguments
+        ---------
+        order: array
+            index of the particle placed in each entry of the arrays
+        """
+        for name in self.fields:
+            setattr(self, name, getattr(self, name)[..., order])
+
+        self.element = self.element[..., order]
+        self.material_id = self.material_id[order]
+        self.set_ids(self.particle_id(np.arange(len(self)))[order])
+
+    def material_groups(self):
+        """
+        Returns the particles of each material as (material, index) pairs,
+        with a slice as index when all particles have the same material
+
+        The groups are calculated once and recalculated when the material
+        index array of the set is replaced (adding or reordering particles)
+        or a particle material is changed
+        """
+        if self._groups is None or self._groups[0] is not self.material_id:
+
+            used = np.unique(self.material_id)
+
+            if len(used) == 1:
+                groups = [(self.materials[used[0]], slice(None))]
+            else:
+                groups = [(self.materials[imat], np.flatnonzero(self.material_id == imat)) for imat in used]
+
+            self._groups = (self.material_id, groups)
+
+        return self._groups[1]
+
+    def set_precision(self, precision):
+        """
+        Converts the floating point fields to a precision, except the fields
+        in `float64_fields`
+
+        Arguments
+        ---------
+        precision: string
+            'float64' or 'float32'
+        """
+        if precision not in ('float64', 'float32'):
+            raise ValueError("unknown precision '%s', can be 'float64' or 'float32'" % precision)
+
+        for name in self.fields:
+            if name not in self.float64_fields:
+                setattr(self, name, getattr(self, name).astype(precision, copy=False))
+
+    def add(self, mass, material, x, size=0, element=0, density=None, material_id=0):
+        """
+        Appends particles to the set
+
+        Arguments
+        ---------
+        mass: float or array
+            particle mass
+
+        material: material or list
+            a material object, or a list of materials indexed by `material_id`
+
+        x: float or array
+            particle position
+
+        size: float or array
+            particle size
+
+        element: int or array
+            index of the element containing the particle
+
+        density: float or array
+            particle density, by default the density of the particle material
+
+        material_id: int or array
+            index of the particle material in the `material` list
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        n = x.shape[-1]
+        start = len(self)
+        new = slice(start, start+n)
+
+        # particle arrays with space for the new particles at the end
+        for name in self.fields:
+            values = np.zeros(self.shape(start+n), dtype=getattr(self, name).dtype)
+            values[..., :start] = getattr(self, name)
+            setattr(self, name, values)
+
+        self.mass[..., new] = mass
+        self.position[..., new] = x
+        self.size[..., new] = size
+
+        elem = np.zeros(self.shape(start+n), dtype=int)
+        elem[..., :start] = self.element
+        elem[..., new] = element
+        self.element = elem
+
+        # material of each particle, as index in the list of materials of the set
+        materials = material if isinstance(material, (list, tuple)) else [material]
+        imat = np.array([self.material_index(m) for m in materials])
+        local_id = np.broadcast_to(np.asarray(material_id, dtype=int), (n,))
+        self.material_id = np.concatenate((self.material_id, imat[local_id]))
+
+        # the new particles of a sorted set are identified after the current ones
+        if self.ids is not None:
+            self.set_ids(np.concatenate((self.ids, np.arange(start, start+n))))
+
+        if density is not None:
+            self.density[..., new] = density
+
+        else:
+            for i, m in enumerate(materials):
+                self.density[..., new][..., local_id == i] = batch_values(m.density)
+
+class material_point_view:
+    """
+    Represent a material point stored in a particle set.
+
+    It exposes the same attributes as `material_point`, reading and writing
+    the arrays of the particle set.
+
+    Attributes
+    ----------
+    id : int
+        particle identification (index of the particle when it was added
+        to the particle set, kept when the set is sorted)
+    """
+    __slots__ = ('_set', '_index')
+
+    def __init__(self, pset, index):
+
+        self._set = pset
+        self._index = index
+
+    mass = _array_field('mass')
+    position = _array_field('position')
+    velocity = _array_field('velocity')
+    stress = _array_field('stress')
+    density = _array_field('density')
+    dstrain = _array_field('dstrain')
+    f_ext = _array_field('f_ext')
+    size = _array_field('size')
+    N1 = _array_field('N1')
+    N2 = _array_field('N2')
+    dN1 = _array_field('dN1')
+    dN2 = _array_field('dN2')
+
+    @property
+    def id(self):
+        return self._index
+
+    @property
+    def momentum(self):
+        return self.mass*self.velocity
+
+    @property
+    def material(self):
+        return self._set.materials[self._set.material_id[_storage_index(self)]]
+
+    @material.setter
+    def material(self, material):
+        self._set.material_id[_storage_index(self)] = self._set.material_index(material)
+        self._set._groups = None
+
+    @property
+    def element(self):
+        elem = self._set.element[..., _storage_index(self)]
+
+        if elem.ndim == 0:
+            return self._set.elements[elem]
+
+        return [self._set.elements[e] for e in elem]
+
+    @element.setter
+    def element(self, ie):
+        self._set.element[..., _storage_index(self)] = ie.id
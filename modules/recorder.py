@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module defines a class recording particle fields in time
+
+"""
+
+import numpy as np
+
+from modules import particle
+
+def time_steps(time, dt):
+    """
+    Returns the time of each loop of the explicit solution
+
+    The times are accumulated as in the solution loop, so they match the loop
+    times exactly
+
+    Arguments
+    ---------
+    time: float
+        simulation time
+
+    dt: float
+        time step
+    """
+    steps = np.concatenate(([0.0], np.cumsum(np.full(int(time/dt)+2, dt))))
+
+    return steps[steps<=time]
+
+class recorder:
+    """
+    Represent a recorder of particle fields in time
+
+    The record buffers are allocated when the solution starts, with one row
+    per recorded step, computing the number of steps from the simulation
+    time and the time step. With adaptive time steps the number of steps is
+    estimated from the initial time step, and the buffers grow if needed.
+
+    Arguments
+    ---------
+    particles: list
+        index of the recorded particles
+
+    fields: list
+        recorded particle fields, for example 'position', 'velocity',
+        'stress' or 'density'
+
+    stride: int
+        number of time steps between records
+
+    Attributes
+    ----------
+    time : array
+        time of each record
+
+    values : dict
+        array of each field, with shape (records, particles) or
+        (records, cases, particles) in batched meshes
+    """
+    def __init__(self, particles=(0,), fields=('position',), stride=1):
+
+        for field in fields:
+            if field not in particle.particle_set.fields:
+                raise ValueError("unknown particle field '%s', can be %s" % (field, ", ".join(particle.particle_set.fields)))
+
+        if stride < 1:
+            raise ValueError("the recording stride must be a positive integer")
+
+        self.particles = np.atleast_1d(np.asarray(particles, dtype=int))
+        self.fields = tuple(fields)
+        self.stride = int(stride)
+        self.step = 0
+        self.count = 0
+        self.time = np.empty(0)
+        self.values = {}
+
+    def start(self, msh, msetup):
+        """
+        Allocates the record buffers for the solution of a model
+
+        Arguments
+        ---------
+        msh: mesh
+            a mesh object
+
+        msetup : model_setup
+            a model_setup object containing the model options
+        """
+        # loop times up to the simulation time, one more than int(time/dt)+1
+        # for the round-off of the accumulated time (unused records are trimmed)
+        nsteps = int(msetup.time/msetup.dt)+2
+        nrecords = (nsteps-1)//self.stride+1
+        shape = (nrecords,) + msh.particles.shape(len(self.particles))
+
+        self.step = 0
+        self.count = 0
+        self.time = np.empty(nrecords)
+        self.values = {field: np.empty(shape) for field in self.fields}
+
+    def record(self, msh, time):
+        """
+        Records the particle fields at the steps multiple of the stride
+
+        Arguments
+        ---------
+        msh: mesh
+            a mesh object
+
+        time: float
+            current time
+        """
+        if self.step % self.stride == 0:
+
+            if self.count == len(self.time):
+                self.reserve(2*self.count+1)
+
+            self.time[self.count] = time
+
+            for field in self.fields:
+                self.values[field][self.count] = getattr(msh.particles, field)[..., msh.particles.storage_index(self.particles)]
+
+            self.count += 1
+
+        self.step += 1
+
+    def reserve(self, nrecords):
+        """
+        Grows the record buffers to a number of records
+
+        Arguments
+        ---------
+        nrecords: int
+            number of records
+        """
+        extra = nrecords-len(self.time)
+
+        if extra > 0:
+            self.time = np.concatenate((self.time, np.empty(extra)))
+
+            for field in self.fields:
+                values = self.values[field]
+                self.values[field] = np.concatenate((values, np.empty((extra,)+values.shape[1:])))
+
+    def finish(self):
+        """
+        Trims the record buffers to the recorded steps
+        """
+        self.time = self.time[:self.count]
+
+        for field in self.fields:
+            self.values[field] = self.values[field][:self.count]
+
+    def __getitem__(self, field):
+        return self.values[field]
@@ -25,6 +25,13 @@ class model_setup:
     dt : float
         time step
 
+    adaptive_dt : bool
+        if True the time step is recalculated in each loop as the critical
+        time step of the particles multiplied by `cfl_factor`
+
+    cfl_factor : float
+        safety factor of the adaptive time step
+
     solution_particle : integer
         index of the particle to get the solution
 
@@ -34,8 +41,54 @@ class model_setup:
     solution_array : array
         array to store the solution in terms of time and field
 
+    recorder : recorder
+        a recorder object for several particles, fields or a recording
+        stride, by default the solution field of the solution particle is
+        recorded in every time step
+
     damping_local_alpha : float
         local damping factor proportional to the total nodal force
+
+    timer : phase_timer
+        a phase_timer object to measure the time of each phase of the time
+        steps (see `phase_timer.report`), or None
+
+    custom_phases : list
+        custom phases of the time step, as (name, function, after, schemes),
+        see `solver.register_phase`
+
+    checkpoint_file : string
+        file to write checkpoints of the solution, or None
+
+    checkpoint_interval : int
+        number of time steps between checkpoints
+
+    sort_interval : int
+        number of time steps between sorts of the particle arrays by
+        element, or 0 to sort only by `sort_threshold`. Sorted particles
+        are interpolated to the nodes by element segments. The particles
+        keep their identification (`solution_particle`, `msh.particles[i]`)
+
+    sort_threshold : float
+        the particle arrays are sorted when the fraction of consecutive
+        particles not ordered by element exceeds this value, or None
+
+    threads : int
+        number of threads of the particle passes interpolating to the nodes
+        and from the nodes (numpy backend). The particles are split in
+        ranges and the nodal sums of the ranges are added in a fixed order,
+        so the results are the same in every run with the same number of
+        threads
+
+    precision : string
+        precision of the particle fields, can be 'float64' or 'float32'
+        (half the memory of the particles). The particle positions and the
+        nodal fields, where the particle contributions are summed, are kept
+        in float64
+
+    backend : string
+        time step computation, can be 'numpy' or 'numba' (compiled loops,
+        falls back to 'numpy' when numba is not installed)
         
     """
     def __init__(self):
@@ -44,7 +97,19 @@ class model_setup:
         self.integration_scheme="MUSL"
         self.time=0
         self.dt=0
+        self.adaptive_dt=False
+        self.cfl_factor=0.5
         self.solution_particle=0
         self.solution_field="position"
         self.solution_array=[[],[]]
-        self.damping_local_alpha=0
\ No newline at end of file
+        self.recorder=None
+        self.timer=None
+        self.custom_phases=[]
+        self.checkpoint_file=None
+        self.checkpoint_interval=100
+        self.damping_local_alpha=0
+        self.sort_interval=0
+        self.sort_threshold=None
+        self.threads=1
+        self.precision="float64"
+        self.backend="numpy"
\ No newline at end of file
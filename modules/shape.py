@@ -5,8 +5,14 @@
 
 This module defines nodal shape functions and its derivative
 
+The functions `linear_functions` and `cpGIMP_functions` evaluate the shape
+functions and its derivatives over arrays of positions, giving the same
+values as the scalar functions.
+
 """
 
+import numpy as np
+
 def NiLinear(x,xI,L):
 	"""
 	Calculates the values of the linear interpolation function
@@ -53,6 +59,34 @@ def dNiLinear(x,xI,L):
 	if(0<(x-xI) and (x-xI)<L):
 		return -1/L
 
+def linear_functions(x,xI,L):
+	"""
+	Calculates the values of the linear interpolation function and its gradient
+	over arrays of positions
+
+	Arguments
+	---------
+	x: array
+		points to calculate the function
+	xI: float or array
+		nodal point position
+	L: float or array
+		grid cell spacing
+
+	Returns
+	-------
+	[Ni, dNi]: interpolation function values and gradients
+	"""
+	s = np.asarray(x)-xI
+
+	# outside the node support, left and right side of the node
+	cond = [abs(s)>=L, s<=0]
+
+	Ni = np.select(cond, [0, 1+s/L], 1-s/L)
+	dNi = np.select(cond, [0, 1/L], -1/L)
+
+	return [Ni, dNi]
+
 def sgn(a):
 	"""
 	Sign function
@@ -90,19 +124,19 @@ def NicpGIMP(L,lp,xp,xi):
 		return 0
 		
 	if (-L-lp)<s and s<=(-L+lp):
-		return ((L+lp+s)**2)/(4*L*lp)
+		return ((L+lp+s)*(L+lp+s))/(4*L*lp)
 	
 	if (-L+lp)<s and s<=(-lp):
 		return 1 + (s/L)
 
 	if (-lp)<s and s<=lp:
-		return 1 - (s**2 + lp**2)/(2*L*lp)
+		return 1 - (s*s + lp*lp)/(2*L*lp)
 	
 	if lp<s and s<=(L-lp):
 		return 1 - (s/L)
 
 	if (L-lp)<s and s<=(L+lp):
-		return ((L+lp-s)**2)/(4*L*lp)
+		return ((L+lp-s)*(L+lp-s))/(4*L*lp)
 
 
 def dNicpGIMP(L,lp,xp,xi):
@@ -142,6 +176,52 @@ def dNicpGIMP(L,lp,xp,xi):
 	if (L-lp)<s and s<=(L+lp):
 		return -(L+lp-s)/(2*L*lp)
 
+def cpGIMP_functions(L,lp,xp,xi):
+	"""
+	Calculates the contiguous GIMP shape function values and its gradient
+	over arrays of positions
+	
+	Arguments
+	---------
+
+	L : float or array
+		cell spacing
+	lp : float or array
+		half of current particle size
+	xp : array
+		particle position
+	xi : float or array
+		node position
+
+	Returns
+	-------
+	[Ni, dNi]: interpolation function values and gradients
+	"""
+	
+	s = np.asarray(xp)-xi
+
+	# each interval is tested after the previous ones are excluded
+	cond = [abs(s)>=(L+lp), s<=(-L+lp), s<=(-lp), s<=lp, s<=(L-lp)]
+
+	# branches not selected may divide by a null particle size
+	with np.errstate(divide='ignore', invalid='ignore'):
+
+		Ni = np.select(cond, [0,
+							  ((L+lp+s)*(L+lp+s))/(4*L*lp),
+							  1 + (s/L),
+							  1 - (s*s + lp*lp)/(2*L*lp),
+							  1 - (s/L)],
+					   ((L+lp-s)*(L+lp-s))/(4*L*lp))
+
+		dNi = np.select(cond, [0,
+							   (L+lp+s)/(2*L*lp),
+							   1/L,
+							   -s/(L*lp),
+							   -1/L],
+						-(L+lp-s)/(2*L*lp))
+
+	return [Ni, dNi]
+
 def test_interpolation_functions(x1,x2,xI,L,shape_type):
 	"""
 	Tests the interpolation functions Ni and its gradients dNi
@@ -159,7 +239,6 @@ def test_interpolation_functions(x1,x2,xI,L,shape_type):
 	shape_type: string
 		interpolation function type, may be 'linear' or 'cpGIMP'
 	"""
-	import numpy as np
 	import matplotlib.pyplot as plt
 
 	# particle position	
@@ -171,15 +250,11 @@ def test_interpolation_functions(x1,x2,xI,L,shape_type):
 
 	# linear shape function
 	if (shape_type=='linear'):
-		for i in range(len(x)):
-			ni[i]  = NiLinear(x[i],xI,L)
-			dni[i] = dNiLinear(x[i],xI,L)
+		[ni, dni] = linear_functions(x,xI,L)
 	
 	# cpGIMP shape function
 	elif (shape_type=='cpGIMP'):
-		for i in range(len(x)):
-			ni[i]  = NicpGIMP(L,L/4,x[i],xI)
-			dni[i] = dNicpGIMP(L,L/4,x[i],xI)
+		[ni, dni] = cpGIMP_functions(L,L/4,x,xI)
 
 	plt.plot(x,ni,'-r',label=r'$N_I$')
 	plt.plot(x,dni,'-b',label=r'$dN_I/dx$')
@@ -207,8 +282,6 @@ def get_interpolation_functions(x1,x2,xI,L,shape_type):
 	shape_type: string
 		interpolation function type, may be 'linear' or 'cpGIMP'
 	"""
-	import numpy as np
-	import matplotlib.pyplot as plt
 
 	# particle position	
 	x = np.linspace(x1,x2,num=500);
@@ -219,14 +292,10 @@ def get_interpolation_functions(x1,x2,xI,L,shape_type):
 
 	# linear shape function
 	if (shape_type=='linear'):
-		for i in range(len(x)):
-			ni[i]  = NiLinear(x[i],xI,L)
-			dni[i] = dNiLinear(x[i],xI,L)
+		[ni, dni] = linear_functions(x,xI,L)
 	
 	# cpGIMP shape function
 	elif (shape_type=='cpGIMP'):
-		for i in range(len(x)):
-			ni[i]  = NicpGIMP(L,L/4,x[i],xI)
-			dni[i] = dNicpGIMP(L,L/4,x[i],xI)
+		[ni, dni] = cpGIMP_functions(L,L/4,x,xI)
 
 	return [x, ni, dni]
\ No newline at end of file
@@ -16,12 +16,21 @@ $$\ddot{u}_i$$: is the acceleration
 
 """
 
+# external modules
+import functools
+import warnings
+
+import numpy as np
+
 # local modules
 from modules import interpolation as interpola # for interpolation tasks
 from modules import integration as integra # for integration tasks
 from modules import update # for updating tasks
+from modules import jit # for compiled time steps
+from modules import recorder # for recording the solution
+from modules import checkpoint # for checkpoint and restart
 
-def explicit_solution(msh,msetup):
+def explicit_solution(msh,msetup,resume_from=None):
 	"""
     Calculates the explicit solution of the motion equation using the MPM
     
@@ -34,6 +43,15 @@ def explicit_solution(msh,msetup):
     msetup : model_setup
     	a model_setup object containing the model options
 
+    resume_from : string
+        checkpoint file to continue the solution from, written by a previous
+        solution of the same model (see `checkpoint_file` in model_setup)
+
+    Returns
+    -------
+    solution field in time, with shape (number of cases, number of steps)
+    in batched meshes
+
     """  
     
     # loop couter
@@ -42,99 +60,327 @@ def explicit_solution(msh,msetup):
 	# current loop time
 	it = 0
 
+	# phases of the time step, checking the model options
+	pipeline = step_pipeline(msetup)
+
+	# precision of the particle fields
+	msh.particles.set_precision(msetup.precision)
+
+	# threads of the particle passes
+	msh.threads = msetup.threads
+
+	# sorted particles are interpolated to the nodes by element segments
+	msh.segmented_scatter = msetup.sort_interval>0 or msetup.sort_threshold is not None
+
+	# particle materials for the compiled backend (None for the numpy backend)
+	materials = jit.use_backend(msh,msetup)
+
+	if materials is not None and len(pipeline)>len(scheme_phases[msetup.integration_scheme]):
+	    warnings.warn("custom phases are not compiled, using the numpy backend")
+	    materials = None
+
+	# initial time step of the adaptive time stepping
+	if msetup.adaptive_dt:
+	    msetup.dt = msetup.cfl_factor*update.critical_time_step(msh)
+
+	# recorder of the particle fields, by default the solution field of the solution particle
+	rec = msetup.recorder
+	if rec is None:
+	    rec = recorder.recorder(particles=[msetup.solution_particle],fields=[msetup.solution_field])
+	rec.start(msh,msetup)
+
+	# continue from the loop time and counter of the checkpoint
+	if resume_from is not None:
+	    loop_counter, it = checkpoint.load(resume_from,msh,msetup,rec)
+
+	# phase timer, None when the time is not measured
+	timer = msetup.timer
+
 	# main simulation loop
 	while it<=msetup.time:
-	    
-	    # update particles list in each element
-	    update.particle_list(msh)
 
-	    # update interpolation functions values
-	    update.interpolation_functions_values(msh,msetup.interpolation_type)
+	    # time step from the current particle density
+	    if msetup.adaptive_dt:
+	        msetup.dt = msetup.cfl_factor*update.critical_time_step(msh)
 	    
-	    # particle mass to grid nodal mass
-	    interpola.mass_to_nodes(msh)
-
-	    # particle momentum to grid nodal momentum
-	    interpola.momentum_to_nodes(msh)
-	     
-	    # impose essential boundary conditions (in fixed nodes set mv=0)
-	    msh.elements[0].n1.momentum=0  
-	    
-	    # Update Stress First Scheme
-	    if msetup.integration_scheme=='USF':
+	    # time step to integrate the nodal momentum (half step in the first loop)
+	    dt_momentum = msetup.dt/2.0 if loop_counter==1 else msetup.dt
 
-	        # calculate the grid nodal velocity
-	        update.nodal_velocity(msh)
-	    
-	        # calculate particle strain increment
-	        update.particle_strain_increment(msh,msetup.dt)
-	        
-	        # update particle density
-	        update.particle_density(msh,msetup.dt)
-	    
-	        # update particle stress
-	        update.particle_stress(msh,msetup.dt)
+	    if timer is not None:
+	        timer.start_step(msh.particles.mass.size)
+
+	    # sort the particles by element, periodically or when they are out of order
+	    if ((msetup.sort_interval>0 and loop_counter%msetup.sort_interval==0) or
+	        (msetup.sort_threshold is not None and update.particle_disorder(msh)>msetup.sort_threshold)):
 	        
-	    # particle internal force to nodes
-	    interpola.internal_force_to_nodes(msh)
-	    
-	    # particle external forces to nodes
-	    interpola.external_force_to_nodes(msh)
+	        update.sort_particles(msh)
 
-	    # calculate total force in node
-	    integra.total_force_in_nodes(msh, msetup)    
-	    
-	    # impose essential boundary conditions (in fixed nodes set f=m*a=0)
-	    msh.elements[0].n1.f_tot=0
-
-	    # integrate the grid nodal momentum equation
-	    integra.momentum_in_nodes(msh, msetup.dt/2.0 if loop_counter==1 else msetup.dt)
-	 
-	    # update particle velocity
-	    update.particle_velocity(msh,msetup.dt/2.0 if loop_counter==1 else msetup.dt)
-	    
-	    # update particle position
-	    update.particle_position(msh,msetup.dt)
+	        if timer is not None:
+	            timer.mark('sort')
 
-	    # Modified Update Stress Last Scheme
-	    if(msetup.integration_scheme=='MUSL'):
-	        
-	        # recalculate the grid nodal momentum
-	        update.nodal_momentum(msh)
-	        
-	        # impose essential boundary conditions (in fixed nodes v=0)
-	        msh.elements[0].n1.velocity=0
-	        msh.elements[0].n1.momentum=0
-	    
-	    # Modified Update Stress Last or Update Stress Last Scheme
-	    if(msetup.integration_scheme=='MUSL' or msetup.integration_scheme=='USL'):
-	        
-	        # calculate the grid nodal velocity
-	        update.nodal_velocity(msh)
-	    
-	        # calculate particle strain increment
-	        update.particle_strain_increment(msh,msetup.dt)
+	    if materials is not None:
 
-	        # update particle density
-	        update.particle_density(msh,msetup.dt)
-	    
-	        # update particle stress
-	        update.particle_stress(msh,msetup.dt)
-	    
-	    # reset all nodal values
-	    update.reset_nodal_vaues(msh)
+	        # compiled time step
+	        jit.explicit_step(msh,msetup,dt_momentum,materials)
+
+	        if timer is not None:
+	            timer.mark('compiled step')
+
+	    else:
+
+	        # time step with the numpy functions
+	        explicit_step(msh,msetup,dt_momentum,pipeline)
 
 	    # store data for plot
-	    msetup.solution_array[0].append(it)
-	    
-	    if msetup.solution_field=='velocity':
-	    	msetup.solution_array[1].append(msh.particles[msetup.solution_particle].velocity)
-	    
-	    elif msetup.solution_field=='position':
-	    	msetup.solution_array[1].append(msh.particles[msetup.solution_particle].position)
+	    rec.record(msh,it)
+
+	    if timer is not None:
+	        timer.mark('record')
 	    
 	    # update loop counter
 	    loop_counter+=1
 
 	    # advance in time
-	    it+=msetup.dt
\ No newline at end of file
+	    it+=msetup.dt
+
+	    # write a checkpoint to continue the solution from the next loop
+	    if msetup.checkpoint_file is not None and (loop_counter-1)%msetup.checkpoint_interval==0:
+	        checkpoint.save(msetup.checkpoint_file,msh,msetup,rec,loop_counter,it)
+
+	# solution in time of the first recorded field and particle
+	rec.finish()
+	msetup.solution_array = [rec.time, rec[rec.fields[0]][...,0]]
+
+	return np.transpose(msetup.solution_array[1])
+
+def particle_list(msh,msetup,dt_momentum):
+	"""
+	Updates the particles list in each element
+	"""
+	update.particle_list(msh)
+
+def shape_functions(function,msh,msetup,dt_momentum):
+	"""
+	Updates the interpolation functions values with the function of the interpolation type
+	"""
+	function(msh)
+
+def particles_to_nodes(msh,msetup,dt_momentum):
+	"""
+	Interpolates the particle mass, momentum, internal and external forces to the nodes in a single pass
+	"""
+	interpola.particles_to_nodes(msh)
+
+	# impose essential boundary conditions (mv=m*v)
+	msh.boundary.apply_momentum(msh.nodes)
+
+def mass_and_momentum_to_nodes(msh,msetup,dt_momentum):
+	"""
+	Interpolates the particle mass and momentum to the nodes
+	"""
+	interpola.particles_to_nodes(msh,('mass','momentum'))
+
+	# impose essential boundary conditions (mv=m*v)
+	msh.boundary.apply_momentum(msh.nodes)
+
+def forces_to_nodes(msh,msetup,dt_momentum):
+	"""
+	Interpolates the particle internal and external forces to the nodes
+	"""
+	interpola.particles_to_nodes(msh,('f_int','f_ext'))
+
+def stress_update(msh,msetup,dt_momentum):
+	"""
+	Updates the particle strain, density and stress from the nodal velocity
+	"""
+	# calculate the grid nodal velocity
+	update.nodal_velocity(msh)
+
+	# calculate particle strain increment
+	update.particle_strain_increment(msh,msetup.dt)
+
+	# update particle density
+	update.particle_density(msh,msetup.dt)
+
+	# update particle stress
+	update.particle_stress(msh,msetup.dt)
+
+def force_integration(msh,msetup,dt_momentum):
+	"""
+	Integrates the grid nodal momentum equation
+	"""
+	# impose natural boundary conditions (prescribed nodal forces)
+	msh.boundary.apply_external_force(msh.nodes)
+
+	# calculate total force in node
+	integra.total_force_in_nodes(msh, msetup)
+
+	# impose essential boundary conditions (in nodes with prescribed velocity set f=m*a=0)
+	msh.boundary.apply_total_force(msh.nodes)
+
+	# integrate the grid nodal momentum equation
+	integra.momentum_in_nodes(msh, dt_momentum)
+
+def nodes_to_particles(msh,msetup,dt_momentum):
+	"""
+	Updates the particle velocity and position from the nodal values
+	"""
+	# update particle velocity
+	update.particle_velocity(msh,dt_momentum)
+
+	# update particle position
+	update.particle_position(msh,msetup.dt)
+
+def nodal_momentum(msh,msetup,dt_momentum):
+	"""
+	Recalculates the grid nodal momentum from the updated particle velocity
+	"""
+	update.nodal_momentum(msh)
+
+	# impose essential boundary conditions (v and mv=m*v)
+	msh.boundary.apply_velocity(msh.nodes)
+
+def reset(msh,msetup,dt_momentum):
+	"""
+	Resets all nodal values for the next step calculation
+	"""
+	update.reset_nodal_vaues(msh)
+
+# phases of the time step, called as phase(msh,msetup,dt_momentum)
+phases = {'particle list':particle_list,
+          'particles to nodes':particles_to_nodes,
+          'mass and momentum to nodes':mass_and_momentum_to_nodes,
+          'forces to nodes':forces_to_nodes,
+          'stress update':stress_update,
+          'force integration':force_integration,
+          'nodes to particles':nodes_to_particles,
+          'nodal momentum':nodal_momentum,
+          'reset':reset}
+
+# ordered phases of the time step of each integration scheme
+scheme_phases = {
+	# Update Stress First
+	'USF':['particle list','shape functions','mass and momentum to nodes','stress update',
+	       'forces to nodes','force integration','nodes to particles','reset'],
+	# Update Stress Last
+	'USL':['particle list','shape functions','particles to nodes','force integration',
+	       'nodes to particles','stress update','reset'],
+	# Modified Update Stress Last
+	'MUSL':['particle list','shape functions','particles to nodes','force integration',
+	        'nodes to particles','nodal momentum','stress update','reset']}
+
+def register_phase(msetup,name,function,after,schemes=None):
+	"""
+	Registers a custom phase of the time step in the model options
+
+	Arguments
+	---------
+	msetup : model_setup
+		a model_setup object containing the model options
+
+	name: string
+		phase name, used in the phase timer report
+
+	function: function
+		function called as function(msh,msetup,dt_momentum)
+
+	after: string
+		name of the phase after which the custom phase is called, it must
+		be a phase of all the schemes using the custom phase
+
+	schemes: list
+		integration schemes using the phase, by default all schemes
+	"""
+	schemes = list(scheme_phases) if schemes is None else list(schemes)
+
+	for scheme in schemes:
+	    if scheme not in scheme_phases:
+	        raise ValueError("unknown integration scheme '%s', can be %s" % (scheme, ", ".join(scheme_phases)))
+
+	if name in [phase for scheme in scheme_phases.values() for phase in scheme]+[phase[0] for phase in msetup.custom_phases]:
+	    raise ValueError("the phase '%s' is already defined" % name)
+
+	for scheme in schemes:
+	    names = scheme_phases[scheme]+[phase[0] for phase in msetup.custom_phases if scheme in phase[3]]
+	    if after not in names:
+	        raise ValueError("'%s' is not a phase of the integration scheme '%s'" % (after, scheme))
+
+	msetup.custom_phases.append((name,function,after,schemes))
+
+def remove_phase(msetup,name):
+	"""
+	Removes a custom phase from the model options
+
+	Arguments
+	---------
+	msetup : model_setup
+		a model_setup object containing the model options
+
+	name: string
+		phase name
+	"""
+	msetup.custom_phases[:] = [phase for phase in msetup.custom_phases if phase[0]!=name]
+
+def step_pipeline(msetup):
+	"""
+	Returns the ordered phases of the time step as (name, function) pairs,
+	resolving the integration scheme, the interpolation type and the custom
+	phases of the model options
+
+	Arguments
+	---------
+	msetup : model_setup
+		a model_setup object containing the model options
+	"""
+	if msetup.integration_scheme not in scheme_phases:
+	    raise ValueError("unknown integration scheme '%s', can be %s" % (msetup.integration_scheme, ", ".join(scheme_phases)))
+
+	# interpolation functions of the interpolation type
+	interpolation = functools.partial(shape_functions,update.interpolation_function(msetup.interpolation_type))
+
+	pipeline = [(name, interpolation if name=='shape functions' else phases[name]) for name in scheme_phases[msetup.integration_scheme]]
+
+	# insert the custom phases after their preceding phase
+	for name, function, after, schemes in msetup.custom_phases:
+	    if msetup.integration_scheme in schemes:
+	        names = [phase[0] for phase in pipeline]
+
+	        if after not in names:
+	            raise ValueError("the custom phase '%s' follows '%s', that is not a phase of the integration scheme '%s'" % (name, after, msetup.integration_scheme))
+
+	        pipeline.insert(names.index(after)+1,(name,function))
+
+	return pipeline
+
+def explicit_step(msh,msetup,dt_momentum,pipeline=None):
+	"""
+	Calculates one time step of the explicit solution
+	
+	Arguments
+	---------
+
+	msh: mesh
+		a mesh object
+
+	msetup : model_setup
+		a model_setup object containing the model options
+
+	dt_momentum: float
+		time step used to integrate the nodal momentum and the particle velocity
+
+	pipeline: list
+		phases of the time step from `step_pipeline`, built from the model
+		options if not given
+	"""
+	if pipeline is None:
+	    pipeline = step_pipeline(msetup)
+
+	# phase timer, None when the time is not measured
+	timer = msetup.timer
+
+	for name, phase in pipeline:
+
+	    phase(msh,msetup,dt_momentum)
+
+	    if timer is not None:
+	        timer.mark(name)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module runs parametric studies whose cases can not be solved together in
+a batched mesh, for example cases with different interpolation type,
+integration scheme or mesh resolution.
+
+Each case is a function returning a mesh and a model setup. The cases are
+built and solved in worker processes, so the case functions must be defined at
+module level (or be `functools.partial` objects of such functions).
+
+"""
+
+import traceback
+from concurrent import futures
+
+import numpy as np
+
+from modules import solver
+
+class case_result:
+    """
+    Represent the result of a case of a parametric study
+
+    Attributes
+    ----------
+    index : int
+        case position in the study
+
+    time : array
+        solution time
+
+    solution : array
+        solution field in time
+
+    error : string
+        error traceback if the case failed, or None
+
+    report : string
+        phase timer report if the case setup has a timer, or None
+    """
+    def __init__(self, index, time=None, solution=None, error=None, report=None):
+
+        self.index = index
+        self.time = time
+        self.solution = solution
+        self.error = error
+        self.report = report
+
+def run_case(index, case):
+    """
+    Builds and solves a case, returning a case_result
+
+    Arguments
+    ---------
+    index: int
+        case position in the study
+
+    case: function
+        function without arguments returning a mesh and a model_setup object
+    """
+    try:
+        msh, msetup = case()
+        solution = solver.explicit_solution(msh, msetup)
+        report = msetup.timer.report() if msetup.timer is not None else None
+        return case_result(index, np.asarray(msetup.solution_array[0]), np.asarray(solution), report=report)
+
+    except Exception:
+        return case_result(index, error=traceback.format_exc())
+
+def run_study(cases, workers=None, progress=None):
+    """
+    Solves the cases of a parametric study in parallel worker processes
+
+    Arguments
+    ---------
+    cases: list
+        functions without arguments returning a mesh and a model_setup object
+
+    workers: int
+        number of worker processes, by default the number of processors
+
+    progress: function
+        called as `progress(result, completed, total)` each time a case finishes
+
+    Returns
+    -------
+    list of case_result objects, in the order of the cases. A failed case has
+    its traceback in `error` and does not stop the other cases.
+    """
+    results = [None]*len(cases)
+
+    with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+
+        jobs = {pool.submit(run_case, i, case): i for i, case in enumerate(cases)}
+
+        for completed, job in enumerate(futures.as_completed(jobs), 1):
+
+            try:
+                result = job.result()
+
+            except Exception:
+                # the worker process died or the case could not be sent to it
+                result = case_result(jobs[job], error=traceback.format_exc())
+
+            results[result.index] = result
+
+            if progress is not None:
+                progress(result, completed, len(cases))
+
+    return results
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module splits the particle passes in chunks solved by a pool of threads
+
+The particles are split in contiguous ranges that depend only on the number
+of particles and threads, and the results of the chunks are combined in the
+order of the ranges, so the solution is the same in every run with the same
+number of threads. The numpy operations release the interpreter lock on large
+arrays, so the chunks are computed concurrently.
+
+"""
+
+import concurrent.futures
+
+import numpy as np
+
+# minimum number of particles of a chunk
+min_chunk = 4096
+
+# thread pools by number of threads
+executors = {}
+
+def chunks(n, threads):
+    """
+    Returns the particle ranges of the chunks as slices
+
+    Arguments
+    ---------
+    n: int
+        number of particles
+
+    threads: int
+        number of threads
+    """
+    nchunks = max(min(threads, n//min_chunk), 1)
+    bounds = np.linspace(0, n, nchunks+1).astype(int)
+
+    return [slice(bounds[i], bounds[i+1]) for i in range(nchunks)]
+
+def executor(threads):
+    """
+    Returns the thread pool of a number of threads, created on the first call
+
+    Arguments
+    ---------
+    threads: int
+        number of threads
+    """
+    if threads not in executors:
+        executors[threads] = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+
+    return executors[threads]
+
+def map_chunks(function, n, threads):
+    """
+    Calls a function with the particle range of each chunk, in several
+    threads, returning the results in the order of the ranges
+
+    Arguments
+    ---------
+    function: function
+        function called as `function(chunk)` with a slice of particles
+
+    n: int
+        number of particles
+
+    threads: int
+        number of threads
+    """
+    ranges = chunks(n, threads)
+
+    if len(ranges) == 1:
+        return [function(ranges[0])]
+
+    return list(executor(threads).map(function, ranges))
+
+def sum_chunks(function, n, threads):
+    """
+    Returns the sum of the results of the chunks (private nodal buffers of
+    each thread), added in the order of the particle ranges
+
+    Arguments
+    ---------
+    function: function
+        function called as `function(chunk)` with a slice of particles,
+        returning an array
+
+    n: int
+        number of particles
+
+    threads: int
+        number of threads
+    """
+    results = map_chunks(function, n, threads)
+
+    total = results[0]
+
+    for result in results[1:]:
+        total += result
+
+    return total
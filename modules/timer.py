@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+
+This module defines a class measuring the time of the solution phases
+
+"""
+
+import time
+
+class phase_timer:
+    """
+    Represent a timer accumulating the time of each phase of the time steps
+
+    The time since the previous mark is added to the phase given in each mark,
+    so the phases of a step are measured by marking the end of each phase.
+
+    Attributes
+    ----------
+    phases : dict
+        accumulated time of each phase in nanoseconds
+
+    steps : int
+        number of measured time steps
+
+    particle_steps : int
+        sum of the number of particles in each measured time step
+    """
+    def __init__(self):
+
+        self.phases = {}
+        self.steps = 0
+        self.particle_steps = 0
+        self.last = 0
+
+    def start_step(self, nparticles):
+        """
+        Starts the measurement of a time step
+
+        Arguments
+        ---------
+        nparticles: int
+            number of particles in the time step
+        """
+        self.steps += 1
+        self.particle_steps += nparticles
+        self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        """
+        Adds the time since the previous mark to a phase
+
+        Arguments
+        ---------
+        phase: string
+            phase name
+        """
+        now = time.perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def total(self):
+        """
+        Returns the measured time in seconds
+        """
+        return sum(self.phases.values())*1e-9
+
+    def report(self):
+        """
+        Returns a table with the total time, the mean time per step and the
+        percentage of each phase, and the particles·steps per second
+        """
+        total = sum(self.phases.values())
+        steps = max(self.steps, 1)
+
+        lines = ['%-20s%12s%16s%8s' % ('phase', 'total (s)', 'mean (ms/step)', '%')]
+
+        for phase, elapsed in self.phases.items():
+            lines.append('%-20s%12.4f%16.4f%8.1f' % (phase, elapsed*1e-9, elapsed*1e-6/steps, 100.0*elapsed/max(total, 1)))
+
+        lines.append('%-20s%12.4f%16.4f%8.1f' % ('total', total*1e-9, total*1e-6/steps, 100.0))
+        lines.append('%d steps, %.4g particles·steps/s' % (self.steps, self.particle_steps/max(total*1e-9, 1e-300)))
+
+        return '\n'.join(lines)
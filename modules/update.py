@@ -6,8 +6,53 @@
 This module defines functions for updating tasks
 
 """
+import numpy as np
+
 from modules import interpolation as interp
 from modules import shape as shape
+from modules import threads
+
+def element_nodes(msh,chunk=slice(None)):
+    """
+    Returns the indices of the nodes 1 and 2 of the element containing each particle
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    chunk: slice
+        range of particles, by default all particles
+    """
+    conn=msh.connectivity[msh.particles.element[...,chunk]]
+    return conn[...,0],conn[...,1]
+
+def element_length(msh):
+    """
+    Returns the length of the element containing each particle, or the
+    element length of uniform meshes
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    if msh.le is not None:
+        return msh.le
+    
+    return msh.element_length[msh.particles.element]
+
+def gather(values,index):
+    """
+    Returns nodal values at the given node indices, in each batch case
+
+    Arguments
+    ---------
+    values: array
+        nodal values
+    index: array
+        node indices
+    """
+    return np.take_along_axis(values,index,axis=-1)
 
 def particle_velocity(msh,dt):
     """
@@ -20,18 +65,22 @@ def particle_velocity(msh,dt):
     dt: float
         time step
     """
-    for ip in msh.particles:
-   
-        # current element
-        ie=ip.element    
+    p=msh.particles
+    
+    def update_chunk(c):
+        
+        # nodes of the current element
+        n1,n2=element_nodes(msh,c)
         
-        f1=ie.n1.f_tot # total force node 1
-        m1=ie.n1.mass  # mass node 1
+        f1=gather(msh.nodes.f_tot,n1) # total force node 1
+        m1=gather(msh.nodes.mass,n1)  # mass node 1
         
-        f2=ie.n2.f_tot # total force node 2
-        m2=ie.n2.mass  # mass node 2
+        f2=gather(msh.nodes.f_tot,n2) # total force node 2
+        m2=gather(msh.nodes.mass,n2)  # mass node 2
         
-        ip.velocity+=(f1/m1*ip.N1+f2/m2*ip.N2)*dt
+        p.velocity[...,c]+=(f1/m1*p.N1[...,c]+f2/m2*p.N2[...,c])*dt
+    
+    threads.map_chunks(update_chunk,len(p),msh.threads)
         
 def particle_position(msh,dt):
     """
@@ -44,18 +93,22 @@ def particle_position(msh,dt):
     dt: float
         time step
     """
-    for ip in msh.particles:
-   
-        # current element
-        ie=ip.element    
-         
-        p1=ie.n1.momentum # momentum node 1
-        m1=ie.n1.mass     # mass node 1
+    p=msh.particles
+    
+    def update_chunk(c):
+        
+        # nodes of the current element
+        n1,n2=element_nodes(msh,c)
         
-        p2=ie.n2.momentum # momentum node 2
-        m2=ie.n2.mass     # mass node 2
+        p1=gather(msh.nodes.momentum,n1) # momentum node 1
+        m1=gather(msh.nodes.mass,n1)     # mass node 1
         
-        ip.position+=(p1/m1*ip.N1+p2/m2*ip.N2)*dt
+        p2=gather(msh.nodes.momentum,n2) # momentum node 2
+        m2=gather(msh.nodes.mass,n2)     # mass node 2
+        
+        p.position[...,c]+=(p1/m1*p.N1[...,c]+p2/m2*p.N2[...,c])*dt
+    
+    threads.map_chunks(update_chunk,len(p),msh.threads)
         
 def nodal_velocity(msh):
     """
@@ -66,9 +119,12 @@ def nodal_velocity(msh):
     msh: mesh
         a mesh object
     """
-    for inode in msh.nodes:
-        if(inode.mass!=0):
-            inode.velocity=inode.momentum/inode.mass
+    n=msh.nodes
+    act=msh.active_nodes
+    mass=n.mass[...,act]
+    velocity=n.velocity[...,act]
+    np.divide(n.momentum[...,act],mass,out=velocity,where=mass!=0)
+    n.velocity[...,act]=velocity
             
 def nodal_momentum(msh):
     """
@@ -79,14 +135,9 @@ def nodal_momentum(msh):
     msh: mesh
         a mesh object
     """
-    for inode in msh.nodes:
-        inode.momentum=0
+    msh.nodes.momentum[...,msh.active_nodes]=0
     
-    for ie in msh.elements:
-        for ip in ie.particles:
-
-            ie.n1.momentum+=ip.mass*ip.velocity*ip.N1
-            ie.n2.momentum+=ip.mass*ip.velocity*ip.N2
+    interp.momentum_to_nodes(msh)
               
 def particle_strain_increment(msh,dt):
     """
@@ -99,17 +150,21 @@ def particle_strain_increment(msh,dt):
     dt: float
         time step
     """
-    for ip in msh.particles:
-   
-        # current element
-        ie=ip.element    
+    p=msh.particles
+    
+    def update_chunk(c):
+        
+        # nodes of the current element
+        n1,n2=element_nodes(msh,c)
         
         # nodal velocities
-        v1=ie.n1.velocity # velocity node 1
-        v2=ie.n2.velocity # velocity node 2
+        v1=gather(msh.nodes.velocity,n1) # velocity node 1
+        v2=gather(msh.nodes.velocity,n2) # velocity node 2
         
         # particle strain increment
-        ip.dstrain=(ip.dN1*v1+ip.dN2*v2)*dt
+        p.dstrain[...,c]=(p.dN1[...,c]*v1+p.dN2[...,c]*v2)*dt
+    
+    threads.map_chunks(update_chunk,len(p),msh.threads)
         
 def particle_density(msh,dt):
     """
@@ -123,9 +178,7 @@ def particle_density(msh,dt):
         time step
 
     """
-    for ip in msh.particles:
-   
-        ip.density = ip.density/(1+ip.dstrain)
+    msh.particles.density/=1+msh.particles.dstrain
         
 def particle_stress(msh,dt):
     """
@@ -138,101 +191,193 @@ def particle_stress(msh,dt):
     dt: float
         time step
     """
-    for ip in msh.particles:
+    p=msh.particles
 
-        ip.material.update_stress(ip,dt)
-        
-def interpolation_functions_values(msh,integration_scheme):    
+    for material,index in p.material_groups():
+
+        # materials without array stress update are updated particle by particle
+        if not hasattr(material,'update_stress_batch'):
+            for i in np.arange(len(p))[index]:
+                material.update_stress(p[p.particle_id(i)],dt)
+            continue
+
+        p.stress[...,index]=material.update_stress_batch(p.stress[...,index],p.dstrain[...,index],p.density[...,index],dt)
+
+def critical_time_step(msh):
     """
-    Update the values of the nodal interpolation functions and its gradients
+    Returns the critical time step of the mesh, the minimum over the
+    particles (and batch cases) of the critical time step of the material
 
     Arguments
     ---------
     msh: mesh
         a mesh object
-    integration_scheme: string
-        a string with the interpolation shceme, can be 'linear' or 'cpGIMP'
     """
-    for ip in msh.particles:
-        
-        # current element
-        ie=ip.element
-        
-        if integration_scheme=="linear":
-        
-            # interpolation functions
-            ip.N1=shape.NiLinear(ip.position,ie.n1.x,ie.L)
-            ip.N2=shape.NiLinear(ip.position,ie.n2.x,ie.L)
-        
-            # interpolation functions gradients
-            ip.dN1=shape.dNiLinear(ip.position,ie.n1.x,ie.L)
-            ip.dN2=shape.dNiLinear(ip.position,ie.n2.x,ie.L)
-        
-        elif integration_scheme=="cpGIMP":
+    p=msh.particles
+    dt=np.inf
+
+    for imat, material in enumerate(p.materials):
+
+        selected=p.material_id==imat
+
+        if np.any(selected):
+            L=msh.le if msh.le is not None else msh.element_length[p.element[...,selected]]
+            dt=min(dt,np.min(material.critical_time_step(p.density[...,selected],L)))
 
-            # interpolation functions
-            ip.N1=shape.NicpGIMP(ie.L,ip.size/2,ip.position,ie.n1.x)
-            ip.N2=shape.NicpGIMP(ie.L,ip.size/2,ip.position,ie.n2.x)
+    return dt
         
-            # interpolation functions gradients
-            ip.dN1=shape.dNicpGIMP(ie.L,ip.size/2,ip.position,ie.n1.x)
-            ip.dN2=shape.dNicpGIMP(ie.L,ip.size/2,ip.position,ie.n2.x)
+def linear_functions_values(msh):
+    """
+    Update the values of the linear interpolation functions and its gradients
 
-        else:
-            print("error in integration scheme keyword")
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    p=msh.particles
+    
+    # nodes of the current element
+    n1,n2=element_nodes(msh)
+    
+    # length of the current element
+    L=element_length(msh)
+    
+    # interpolation functions and its gradients
+    p.N1[...],p.dN1[...]=shape.linear_functions(p.position,msh.nodes.x[n1],L)
+    p.N2[...],p.dN2[...]=shape.linear_functions(p.position,msh.nodes.x[n2],L)
+
+def cpGIMP_functions_values(msh):
+    """
+    Update the values of the cpGIMP interpolation functions and its gradients
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    p=msh.particles
+    
+    # nodes of the current element
+    n1,n2=element_nodes(msh)
+    
+    # length of the current element
+    L=element_length(msh)
+    
+    # interpolation functions and its gradients
+    p.N1[...],p.dN1[...]=shape.cpGIMP_functions(L,p.size/2,p.position,msh.nodes.x[n1])
+    p.N2[...],p.dN2[...]=shape.cpGIMP_functions(L,p.size/2,p.position,msh.nodes.x[n2])
+
+# functions updating the interpolation functions values of each interpolation type
+interpolation_functions={'linear':linear_functions_values,'cpGIMP':cpGIMP_functions_values}
+
+def interpolation_function(interpolation_type):
+    """
+    Returns the function updating the interpolation functions values
+
+    Arguments
+    ---------
+    interpolation_type: string
+        interpolation function type, can be 'linear' or 'cpGIMP'
+    """
+    if interpolation_type not in interpolation_functions:
+        raise ValueError("unknown interpolation type '%s', can be %s" % (interpolation_type, ", ".join(interpolation_functions)))
+
+    return interpolation_functions[interpolation_type]
+
+def interpolation_functions_values(msh,interpolation_type):    
+    """
+    Update the values of the nodal interpolation functions and its gradients
+
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    interpolation_type: string
+        interpolation function type, can be 'linear' or 'cpGIMP'
+    """
+    interpolation_function(interpolation_type)(msh)
 
 def  reset_nodal_vaues(msh):
     """
     Reset all nodal values for the next step calculation
 
+    Only the active nodes and the nodes with boundary conditions are reset,
+    the values of the other nodes are zero
+
     Arguments
     ---------
     msh: mesh
         a mesh object
     """
-    for inode in msh.nodes:
-        inode.velocity = 0
-        inode.mass     = 0
-        inode.momentum = 0
-        inode.f_int = 0
-        inode.f_ext = 0
-        inode.f_tot = 0
+    n=msh.nodes
 
-def particle_list(msh):
+    for act in (msh.active_nodes,msh.boundary.nodes):
+        n.velocity[...,act] = 0
+        n.mass[...,act]     = 0
+        n.momentum[...,act] = 0
+        n.f_int[...,act] = 0
+        n.f_ext[...,act] = 0
+        n.f_tot[...,act] = 0
+
+def particle_disorder(msh):
     """
-    Update particle list in each mesh element.
+    Returns the fraction of consecutive particles in the particle arrays
+    that are not ordered by element (of the first case in batched meshes)
 
     Arguments
     ---------
     msh: mesh
         a mesh object
     """
+    keys=np.atleast_2d(msh.element_keys())[0]
+    
+    if len(keys)<2:
+        return 0.0
+    
+    return np.count_nonzero(keys[1:]<keys[:-1])/(len(keys)-1)
 
-    # clear particle list in elements
-    for ie in msh.elements:
-        ie.particles = []
-
-    # for each particle in model
-    for ip in msh.particles:
+def sort_particles(msh):
+    """
+    Sorts the particle arrays by element (of the first case in batched
+    meshes), with the particles outside the mesh at the end. The particles
+    keep their identification, see `particle_set.permute`.
 
-        # get particle position
-        xp = ip.position
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    order=np.argsort(np.atleast_2d(msh.element_keys())[0],kind='stable')
+    
+    msh.particles.permute(order)
+    
+    if msh.particles_outside is not None:
+        msh.particles_outside=msh.particles_outside[...,order]
+    
+    # update particles in elements
+    msh.set_particles_in_elements()
 
-        # for each element in mesh
-        for ie in msh.elements:
+def particle_list(msh):
+    """
+    Update the element containing each particle and the particles in each mesh element.
 
-            # get the nodal position
-            xn1 = ie.n1.x
-            xn2 = ie.n2.x
+    Arguments
+    ---------
+    msh: mesh
+        a mesh object
+    """
+    p=msh.particles
 
-            # verify the particle is inside the element
-            if xp>=xn1 and xp<xn2:
+    # element containing each particle
+    elem=msh.locate(p.position)
 
-                # update element in particle
-                ip.element = ie
+    # particles outside the mesh keep their element and are left out of the elements
+    outside=elem<0
+    msh.particles_outside=outside if np.any(outside) else None
 
-                # add the particle to the element list
-                ie.particles.append(ip)
+    # update element in particles
+    p.element[...]=np.where(outside,p.element,elem)
 
-                # break element loop for testing other particle
-                break
\ No newline at end of file
+    # update particles in elements
+    msh.set_particles_in_elements()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+
+This example verifies that a solution restarted from a checkpoint gives the
+same results as an uninterrupted solution. The solution is interrupted at
+half of the simulation time, after writing a checkpoint, and continued from
+the checkpoint until the end.
+
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import os # for removing the checkpoint file
+import tempfile # for the checkpoint file name
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+
+# checkpoint file
+checkpoint_file=os.path.join(tempfile.mkdtemp(),'bar_vibration.npz')
+
+def bar_vibration(time,checkpoints=False):
+    """
+    Returns the mesh and the model setup of the continuum bar vibration problem,
+    writing checkpoints every 100 steps if `checkpoints` is True
+    """
+    L=25
+    
+    msh=mesh.mesh_1D(L=L,nelem=15)
+    elastic=material.linear_elastic(E=100,density=1)
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+    msh.particles.velocity[:]=0.1*np.sin(np.pi/2.0/L*msh.particles.position)
+
+    msetup=setup.model_setup()
+    msetup.interpolation_type="cpGIMP"
+    msetup.integration_scheme="MUSL"
+    msetup.time=time
+    msetup.dt=0.1
+    msetup.solution_particle=-1
+    msetup.solution_field='velocity'
+    msetup.checkpoint_file=checkpoint_file if checkpoints else None
+    msetup.checkpoint_interval=100
+
+    return msh,msetup
+
+# uninterrupted solution
+msh,msetup=bar_vibration(time=40)
+solution=solver.explicit_solution(msh,msetup)
+
+# solution interrupted at half of the time, after the checkpoint of the step 200
+interrupted,msetup=bar_vibration(time=20,checkpoints=True)
+solver.explicit_solution(interrupted,msetup)
+
+# solution continued from the checkpoint
+restarted,msetup=bar_vibration(time=40)
+restarted_solution=solver.explicit_solution(restarted,msetup,resume_from=checkpoint_file)
+
+with np.load(checkpoint_file) as data:
+    print('checkpoint file: %d bytes, time %.2f'%(os.path.getsize(checkpoint_file),data['it']))
+print('maximum difference restarted-uninterrupted: solution %.3e, particle stress %.3e, particle position %.3e'
+      %(np.max(np.abs(restarted_solution-solution)),
+        np.max(np.abs(restarted.particles.stress-msh.particles.stress)),
+        np.max(np.abs(restarted.particles.position-msh.particles.position))))
+
+os.remove(checkpoint_file)
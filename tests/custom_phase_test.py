@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+
+This example verifies that a custom phase of the time step applies only to
+the solutions of the model setup where it is registered, and that a custom
+phase following a phase that is not in an integration scheme is rejected.
+
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+
+def apply_body_force(msh,msetup,dt_momentum):
+    """
+    Adds a constant body force to the particles
+    """
+    msh.particles.f_ext[:]=-0.01*msh.particles.mass
+
+def bar_vibration(integration_scheme):
+    """
+    Returns the mesh and the model setup of the continuum bar vibration problem
+    """
+    L=25
+
+    msh=mesh.mesh_1D(L=L,nelem=50)
+    elastic=material.linear_elastic(E=100,density=1)
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+    msh.particles.velocity[:]=0.1*np.sin(np.pi/2.0/L*msh.particles.position)
+
+    msetup=setup.model_setup()
+    msetup.integration_scheme=integration_scheme
+    msetup.time=5
+    msetup.dt=0.02
+    msetup.solution_particle=-1
+    msetup.solution_field='velocity'
+
+    return msh,msetup
+
+# solution with the body force phase
+msh,msetup=bar_vibration("MUSL")
+solver.register_phase(msetup,'body force',apply_body_force,after='particle list')
+forced=solver.explicit_solution(msh,msetup)
+
+# solution of a new model setup, without the body force phase
+msh,msetup=bar_vibration("MUSL")
+free=solver.explicit_solution(msh,msetup)
+
+print('custom phases of a new setup: %d, maximum difference forced-free %.3e'%(len(msetup.custom_phases),np.max(np.abs(forced-free))))
+
+# 'nodal momentum' is a phase of MUSL only
+msh,msetup=bar_vibration("USF")
+try:
+    solver.register_phase(msetup,'body force',apply_body_force,after='nodal momentum')
+except ValueError as error:
+    print('rejected:',error)
+
+# registered for MUSL only, the USF solution does not use it
+solver.register_phase(msetup,'body force',apply_body_force,after='nodal momentum',schemes=['MUSL'])
+usf=solver.explicit_solution(msh,msetup)
+msh,msetup=bar_vibration("USF")
+print('maximum difference USF with and without a MUSL phase %.3e'%np.max(np.abs(usf-solver.explicit_solution(msh,msetup))))
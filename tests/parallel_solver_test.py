@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+
+This example verifies that the solution of the parallel solver, with the mesh
+split in several subdomains, matches the serial solver except for the
+round-off of the sums in the nodes shared by two subdomains.
+
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+from modules import parallel # for solving the problem in parallel
+
+def bar_vibration():
+    """
+    Returns the mesh and the model setup of the continuum bar vibration problem
+    """
+    L=25
+
+    msh=mesh.mesh_1D(L=L,nelem=100)
+    elastic=material.linear_elastic(E=100,density=1)
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+    msh.particles.velocity[:]=0.1*np.sin(np.pi/2.0/L*msh.particles.position)
+
+    msetup=setup.model_setup()
+    msetup.interpolation_type="linear"
+    msetup.integration_scheme="MUSL"
+    msetup.time=20
+    msetup.dt=0.02
+    msetup.solution_particle=-1
+    msetup.solution_field='velocity'
+
+    return msh,msetup
+
+if __name__ == '__main__':
+
+    # serial solution
+    msh,msetup=bar_vibration()
+    serial=solver.explicit_solution(msh,msetup)
+
+    for workers in [2,3,4]:
+
+        # parallel solution
+        msh_parallel,msetup=bar_vibration()
+        solution=parallel.explicit_solution(msh_parallel,msetup,workers=workers)
+
+        print('%d workers: maximum difference parallel-serial: solution %.3e (maximum %.3e), particle stress %.3e (maximum %.3e)'
+              %(workers,np.max(np.abs(solution-serial)),np.max(np.abs(serial)),
+                np.max(np.abs(msh_parallel.particles.stress-msh.particles.stress)),np.max(np.abs(msh.particles.stress))))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+
+This example tests the particle seeding with the material and the density
+varying in space.
+
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh generation
+from modules import material # for material definition
+
+# create an 1D mesh
+msh = mesh.mesh_1D(L=20,nelem=10)
+
+# define two linear materials
+soil = material.linear_elastic(E=50,density=1800)
+rock = material.linear_elastic(E=500,density=2500)
+
+# material given as a condition on the particle position
+msh.put_particles_in_all_mesh_elements(ppelem=2,material=[soil,rock],material_id=lambda x: x>10)
+
+for ip in msh.particles:
+    print('particle %d\tx=%.2f\tdensity=%.0f\trock=%s'%(ip.id,ip.position,ip.density,ip.material is rock))
+
+# density given per element
+msh = mesh.mesh_1D(L=20,nelem=10)
+msh.put_particles_in_mesh_by_elements_id(ppelem=2,material=soil,elem_i=0,elem_f=9,density=np.linspace(1800,2000,10))
+
+print('densities:',msh.particles.density)
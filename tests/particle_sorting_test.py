@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+
+This example verifies that sorting the particle arrays by element does not
+change the solution, with two materials updating the stress particle by
+particle (without `update_stress_batch`) and the particles initially stored
+in random order.
+
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+
+class elastic_material:
+    """
+    Represents a linear elastic material updating the stress particle by particle
+
+    Arguments
+    ---------
+    E : float
+        Young's modulus
+    density : float
+        density
+    """
+    def __init__(self,E,density):
+
+        self.E=E # Young's modulus
+        self.density=density # density
+
+    def update_stress(self,particle,dt):
+
+        particle.stress+=particle.dstrain*self.E
+
+def solution(sort_interval):
+    """
+    Returns the particle stress ordered by particle identification
+    """
+    # bar with a soft and a stiff material
+    msh=mesh.mesh_1D(L=25,nelem=50)
+    materials=[elastic_material(E=100,density=1),elastic_material(E=400,density=1)]
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=materials,material_id=lambda x: np.where(x>10,1,0))
+
+    # particles stored in random order
+    msh.particles.permute(np.random.default_rng(0).permutation(len(msh.particles)))
+
+    for ip in msh.particles:
+        ip.velocity=0.1*np.sin(np.pi/2.0/25*ip.position)
+
+    msetup=setup.model_setup()
+    msetup.integration_scheme="MUSL"
+    msetup.time=10
+    msetup.dt=0.02
+    msetup.sort_interval=sort_interval
+
+    solver.explicit_solution(msh,msetup)
+
+    return np.array([ip.stress for ip in msh.particles])
+
+unsorted=solution(sort_interval=0)
+sorted_=solution(sort_interval=10)
+
+print('maximum stress %.6e, maximum difference sorted-unsorted %.3e'%(np.max(np.abs(unsorted)),np.max(np.abs(sorted_-unsorted))))
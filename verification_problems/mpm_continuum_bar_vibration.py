@@ -27,6 +27,7 @@ from modules import mesh # for mesh definition
 from modules import material # for material definition
 from modules import setup # for setup the problem
 from modules import solver # for solving the problem in time
+from modules import recorder # for recording the solution
 
 # bar length
 L=25
@@ -63,22 +64,15 @@ b1=np.pi/2.0/L
 for ip in msh.particles:
   ip.velocity=vo*np.sin(b1*ip.position)
 
+# record 250 values of the solution in time
+nsteps = len(recorder.time_steps(msetup.time,msetup.dt))
+msetup.recorder = recorder.recorder(particles=[msetup.solution_particle],fields=[msetup.solution_field],stride=max(nsteps//250,1))
+
 # solve the problem in time
 solver.explicit_solution(msh,msetup)
 
-# subset for numerical solution
-n_values = 250
-indices = np.linspace(0, len(msetup.solution_array[0])-1, n_values, dtype=int)
-
-y_subset = []
-x_subset = []
-
-for i_index in range(len(indices)): 
-    x_subset.append(msetup.solution_array[0][indices[i_index]])
-    y_subset.append(msetup.solution_array[1][indices[i_index]])
-    
 # plot mpm solution
-plt.plot(x_subset,y_subset,' ',color='r',marker='s',markerfacecolor='none',label='MPM')
+plt.plot(msetup.solution_array[0],msetup.solution_array[1],' ',color='r',marker='s',markerfacecolor='none',label='MPM')
 
 
 # plot the analytical solution
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+This example approximates the continuum 1D bar vibration problem using MPM
+with several mesh resolutions and interpolation types. The cases are solved
+in parallel processes and the velocity error is compared with the analytical
+solution.
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import functools # for case definition
+import matplotlib.pyplot as plt # for plot
+import numpy as np # for sin
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import study # for solving the cases in parallel
+from analitical_solutions import analitical_solution_continuum_bar_vibration as cbv
+
+# bar length
+L=25
+
+# material parameters
+E=100
+density=1
+
+# initial velocity amplitude
+vo=0.1
+
+def bar_vibration(nelements,interpolation_type):
+    """
+    Returns the mesh and the model setup of the continuum bar vibration problem
+
+    Arguments
+    ---------
+    nelements: int
+        number of elements
+
+    interpolation_type: string
+        interpolation function type, 'linear' or 'cpGIMP'
+    """
+    # create an 1D mesh
+    msh = mesh.mesh_1D(L=L,nelem=nelements)
+
+    # define a linear material 
+    elastic = material.linear_elastic(E=E,density=density)
+
+    # put particles in mesh element and set the material
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+
+    # setup the model
+    msetup = setup.model_setup()
+    msetup.interpolation_type=interpolation_type
+    msetup.integration_scheme="MUSL"
+    msetup.time=30
+    msetup.dt=0.1*msh.elements[0].L/(E/density)**0.5
+    msetup.solution_particle=-1
+    msetup.solution_field='velocity'
+
+    # impose initial condition in particles
+    b1=np.pi/2.0/L
+    for ip in msh.particles:
+        ip.velocity=vo*np.sin(b1*ip.position)
+
+    return msh, msetup
+
+def print_progress(result, completed, total):
+    """ print the study progress """
+    print('case %d finished (%d/%d)%s'%(result.index,completed,total,' with error' if result.error else ''))
+
+if __name__ == '__main__':
+
+    # study cases
+    resolutions = [5,10,20,40]
+    interpolations = ['linear','cpGIMP']
+    cases = [functools.partial(bar_vibration,n,t) for t in interpolations for n in resolutions]
+
+    # solve the cases in parallel
+    results = study.run_study(cases,workers=4,progress=print_progress)
+
+    for i,t in enumerate(interpolations):
+
+        errors = []
+
+        for j,n in enumerate(resolutions):
+
+            result = results[i*len(resolutions)+j]
+
+            # analytical velocity of the last particle, at its initial position
+            x_sol = L-L/n/4
+            dt = result.time[1]-result.time[0]
+            [anal_xt,anal_vt,anal_t] = cbv.continuum_bar_vibration_solution(L,E,density,result.time[-1]+dt,dt,vo,x_sol)
+
+            errors.append(np.max(np.abs(result.solution-np.interp(result.time,anal_t,anal_vt))))
+
+        plt.loglog(L/np.array(resolutions),errors,'-o',label=t)
+
+    # configure axis, legends and show plot
+    plt.xlabel('Element length (m)')
+    plt.ylabel('Maximum velocity error (m/s)')
+    plt.legend()
+    plt.show()
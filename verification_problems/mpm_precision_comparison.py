@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Purpose
+-------
+This example compares the accuracy of the particle fields stored in float64
+and float32 precision, against the analytical solutions of the wave in a pile
+and the continuum bar vibration problems.
+"""
+
+# include the modules' path to the current path
+import sys
+sys.path.append("..")
+
+# external modules
+import numpy as np # for arrays
+
+# local modules
+from modules import mesh # for mesh definition
+from modules import material # for material definition
+from modules import setup # for setup the problem
+from modules import solver # for solving the problem in time
+from analitical_solutions import analitical_solution_wave_in_pile as wip
+from analitical_solutions import analitical_solution_continuum_bar_vibration as cbv
+
+def wave_in_pile(precision):
+    """
+    Returns the time, the MPM and the analytical displacement of the pile top
+    """
+    L=15
+    po=-10e3
+
+    msh = mesh.mesh_1D(L=L,nelem=150)
+    elastic = material.linear_elastic(E=100e6,density=2500)
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+    msh.particles[-1].f_ext=po
+
+    msetup = setup.model_setup()
+    msetup.interpolation_type="linear"
+    msetup.integration_scheme="USF"
+    msetup.time=0.2
+    msetup.dt=msh.elements[0].L/(elastic.E/elastic.density)**0.5
+    msetup.solution_particle=-1
+    msetup.solution_field='position'
+    msetup.precision=precision
+
+    x0=msh.particles[-1].position
+    solver.explicit_solution(msh,msetup)
+
+    [anal_xt,anal_vt,anal_t] = wip.wave_in_pile_fixed_and_loaded(L=L,E=elastic.E,rho=elastic.density,time=msetup.time,dt=msetup.dt/2,po=po,x=x0,n_sum=1000)
+
+    t=msetup.solution_array[0]
+    return t,msetup.solution_array[1]-x0,np.interp(t,anal_t,anal_xt-x0)
+
+def bar_vibration(precision):
+    """
+    Returns the time, the MPM and the analytical velocity of the bar end
+    """
+    L=25
+    vo=0.1
+
+    msh = mesh.mesh_1D(L=L,nelem=15)
+    elastic = material.linear_elastic(E=100,density=1)
+    msh.put_particles_in_all_mesh_elements(ppelem=2,material=elastic)
+    msh.particles.velocity[:]=vo*np.sin(np.pi/2.0/L*msh.particles.position)
+
+    msetup = setup.model_setup()
+    msetup.interpolation_type="linear"
+    msetup.integration_scheme="MUSL"
+    msetup.time=60
+    msetup.dt=0.1
+    msetup.solution_particle=-1
+    msetup.solution_field='velocity'
+    msetup.precision=precision
+
+    solver.explicit_solution(msh,msetup)
+
+    [anal_xt,anal_vt,anal_t] = cbv.continuum_bar_vibration_solution(L,elastic.E,elastic.density,msetup.time,msetup.dt,vo,msh.particles[-1].position)
+
+    t=msetup.solution_array[0]
+    return t,msetup.solution_array[1],np.interp(t,anal_t,anal_vt)
+
+# maximum error relative to the maximum of the analytical solution
+for name,problem in [('wave in pile',wave_in_pile),('bar vibration',bar_vibration)]:
+
+    t,mpm64,anal=problem('float64')
+    t,mpm32,anal=problem('float32')
+
+    scale=np.max(np.abs(anal))
+    print("%s: error float64 %.3e, error float32 %.3e, difference float32-float64 %.3e"
+          %(name,np.max(np.abs(mpm64-anal))/scale,np.max(np.abs(mpm32-anal))/scale,np.max(np.abs(mpm32-mpm64))/scale))
@@ -20,13 +20,13 @@ sys.path.append("..")
 
 # external modules
 import matplotlib.pyplot as plt # for plot
-import numpy as np
 
 # local modules
 from modules import mesh # for mesh definition
 from modules import material # for material definition
 from modules import setup # for setup the problem
 from modules import solver # for solving the problem in time
+from modules import recorder # for recording the solution
 
 # bar length
 L=1
@@ -61,21 +61,15 @@ msetup.dt = msetup.dt if msetup.dt < dt_critical else dt_critical
 vo = 0.1
 msh.particles[-1].velocity=vo
 
+# record 400 values of the solution in time
+nsteps = len(recorder.time_steps(msetup.time,msetup.dt))
+msetup.recorder = recorder.recorder(particles=[msetup.solution_particle],fields=[msetup.solution_field],stride=max(nsteps//400,1))
+
 # solve the problem in time
 solver.explicit_solution(msh,msetup)
 
-n_values = 400
-indices = np.linspace(0, len(msetup.solution_array[0])-1, n_values, dtype=int)
-
-y_subset = []
-x_subset = []
-
-for i_index in range(len(indices)): 
-    x_subset.append(msetup.solution_array[0][indices[i_index]])
-    y_subset.append(msetup.solution_array[1][indices[i_index]])
-    
 # plot mpm solution
-plt.plot(x_subset,y_subset,' ',color='r',marker='s',markerfacecolor='none',label='MPM')
+plt.plot(msetup.solution_array[0],msetup.solution_array[1],' ',color='r',marker='s',markerfacecolor='none',label='MPM')
 
 # plot the analytical solution
 from analitical_solutions import analitical_solution_single_mass_vibration as smpv
@@ -4,7 +4,8 @@
 Purpose
 -------
 This example approximates the 1D single mass bar vibration problem using MPM.
-In this example, a parametric study over the density of the mass is performed 
+In this example, a parametric study over the density of the mass is performed,
+solving all density values together in a batched mesh
 
 Data
 ----
@@ -29,6 +30,7 @@ from modules import mesh # for mesh definition
 from modules import material # for material definition
 from modules import setup # for setup the problem
 from modules import solver # for solving the problem in time
+from modules import recorder # for recording the solution
 
 # density values
 density_serie = np.linspace(1,15,6)
@@ -38,63 +40,59 @@ density_serie = np.linspace(1,15,6)
 tableau_colors = mcolors.TABLEAU_COLORS
 color_list = list(tableau_colors.values())[:len(density_serie)]
 
-# main loop
-for i in range(len(density_serie)):
+# bar length
+L=1
 
-    # bar length
-    L=1
-    
-    # number of elements
-    nelements=1
-    
-    # create an 1D mesh
-    msh = mesh.mesh_1D(L,nelements)
-    
-    # define a linear material 
-    elastic = material.linear_elastic(E=50,density=density_serie[i])
-    
-    # put particles in mesh element and set the material
-    msh.put_particles_in_all_mesh_elements(ppelem=1,material=elastic)
-    
-    # setup the model
-    msetup = setup.model_setup()
-    msetup.interpolation_type="linear"
-    msetup.integration_scheme="MUSL"
-    msetup.time=10
-    msetup.dt=0.001
-    msetup.solution_particle=-1
-    msetup.solution_field="position"
-    msetup.damping_local_alpha=0.0
-    
-    # verify time step
-    dt_critical=msh.elements[0].L/(elastic.E/elastic.density)**0.5
-    msetup.dt = msetup.dt if msetup.dt < dt_critical else dt_critical
-    
-    # impose initial condition in particle
-    vo = 0.1
-    msh.particles[-1].velocity=vo
-    
-    # solve the problem in time
-    solver.explicit_solution(msh,msetup)
-    
-    n_values = 100
-    indices = np.linspace(0, len(msetup.solution_array[0])-1, n_values, dtype=int)
-    
-    y_subset = []
-    x_subset = []
+# number of elements
+nelements=1
+
+# create an 1D mesh solving all density values together
+msh = mesh.mesh_1D(L,nelements,batch=len(density_serie))
+
+# define a linear material 
+elastic = material.linear_elastic(E=50,density=density_serie)
+
+# put particles in mesh element and set the material
+msh.put_particles_in_all_mesh_elements(ppelem=1,material=elastic)
+
+# setup the model
+msetup = setup.model_setup()
+msetup.interpolation_type="linear"
+msetup.integration_scheme="MUSL"
+msetup.time=10
+msetup.dt=0.001
+msetup.solution_particle=-1
+msetup.solution_field="position"
+msetup.damping_local_alpha=0.0
+
+# verify time step (the lightest material gives the critical time step)
+dt_critical=msh.elements[0].L/(elastic.E/density_serie.min())**0.5
+msetup.dt = msetup.dt if msetup.dt < dt_critical else dt_critical
+
+# impose initial condition in particle
+vo = 0.1
+msh.particles[-1].velocity=vo
+
+# record 100 values of the solution in time
+nsteps = len(recorder.time_steps(msetup.time,msetup.dt))
+msetup.recorder = recorder.recorder(particles=[msetup.solution_particle],fields=[msetup.solution_field],stride=max(nsteps//100,1))
+
+# solve the problem in time for all density values
+solution = solver.explicit_solution(msh,msetup)
+time = msetup.solution_array[0]
+
+from analitical_solutions import analitical_solution_single_mass_vibration as smpv
+
+# analytical solution for all density values
+[anal_xt, anal_t] = smpv.single_mass_point_vibration_solution(L,elastic.E,density_serie,msetup.time,msetup.dt,L/2,vo)
+
+for i in range(len(density_serie)):
     
-    for i_index in range(len(indices)): 
-        x_subset.append(msetup.solution_array[0][indices[i_index]])
-        y_subset.append(msetup.solution_array[1][indices[i_index]])
-        
     # plot mpm solution
-    plt.plot(x_subset,y_subset,' ',color=color_list[i],marker='s',markerfacecolor='none',label='Density={:.2f}-MPM'.format(density_serie[i]))
+    plt.plot(time,solution[i],' ',color=color_list[i],marker='s',markerfacecolor='none',label='Density={:.2f}-MPM'.format(density_serie[i]))
     
     # plot the analytical solution
-    from analitical_solutions import analitical_solution_single_mass_vibration as smpv
-    [anal_xt, anal_t] = smpv.single_mass_point_vibration_solution(L,elastic.E,elastic.density,msetup.time,msetup.dt,L/2,vo)
-    
-    plt.plot(anal_t,anal_xt,'-',color=color_list[i],label='Density={:.2f}-Analytical'.format(density_serie[i]))
+    plt.plot(anal_t,anal_xt[:,i],'-',color=color_list[i],label='Density={:.2f}-Analytical'.format(density_serie[i]))
 
 # configure axis, legends and show plot
 plt.xlabel('Time (s)')